@@ -0,0 +1,114 @@
+import os
+from os.path import join
+import random
+from typing import List
+
+from mkck.config import DIR_PHOTOS, FILE_PHOTOS, FILE_STORY, FILE_YEAR
+
+
+WORDS = ['rieka', 'Hron', 'splav', 'loď', 'kemp', 'voda', 'pádlo', 'most', 'jazero', 'Dunaj', 'vietor', 'dážď',
+         'slnko', 'obed', 'večer', 'ráno', 'skupina', 'výlet', 'breh', 'kameň']
+
+# smallest valid baseline JPEG header, the rest of the file is filled with random bytes
+JPEG_HEADER = bytes.fromhex('ffd8ffe000104a46494600010100000100010000')
+
+
+def generate_archive(base: str, years: List[int], events: int=20, non_planned: int=3, photos: int=10,
+                     photo_size: int=64 * 1024, paragraphs: int=20, seed: int=1) -> None:
+    rnd = random.Random(seed)
+
+    for year in years:
+        links = []
+
+        for number in range(1, events + 1):
+            title = _get_title(rnd=rnd, number=number)
+            links.append('<a href="akciadet.php?rok={}&cakcie={}">{}</a>'.format(year, number, title))
+            _write_event(rnd=rnd, event_dir=join(base, str(year), str(number)), year=year, title=title,
+                         photos=photos, photo_size=photo_size, paragraphs=paragraphs)
+
+        title = _get_title(rnd=rnd, number=99)
+        links.append('<a href="akciadet.php?rok={}&cakcie=KT">{}</a>'.format(year, title))
+        _write_event(rnd=rnd, event_dir=join(base, str(year), '99'), year=year, title=title, photos=photos,
+                     photo_size=photo_size, paragraphs=paragraphs)
+
+        for i in range(non_planned):
+            path = 'mp{}_{}'.format(year, i + 1)
+            title = _get_title(rnd=rnd, number=100 + i)
+            links.append('<a href="akciadet.php?rok=2per&cakcie={}">{}</a>'.format(path, title))
+            _write_non_planned_event(rnd=rnd, event_dir=join(base, '2per', path), title=title, photos=photos,
+                                     photo_size=photo_size, paragraphs=paragraphs)
+
+        # every link on its own line, year file patterns are greedy within a line
+        _write(join(base, str(year), FILE_YEAR),
+               '<html><body>\n<h1>Akcie {}</h1>\n{}\n</body></html>\n'.format(year, '<br>\n'.join(links)))
+
+
+def _write_event(rnd: random.Random, event_dir: str, year: int, title: str, photos: int, photo_size: int,
+                 paragraphs: int) -> None:
+    photos_dir = event_dir if year >= 2015 else join(event_dir, DIR_PHOTOS)
+    os.makedirs(photos_dir, exist_ok=True)
+
+    _write(join(event_dir, FILE_STORY), _get_story(rnd=rnd, title=title, paragraphs=paragraphs))
+    _write(join(event_dir, FILE_PHOTOS),
+           '<html><body>\n{}</body></html>\n'.format(_get_photos_page(rnd=rnd, title=title, photos=photos)))
+    _write_photos(rnd=rnd, photos_dir=photos_dir, photos=photos, photo_size=photo_size)
+
+
+def _write_non_planned_event(rnd: random.Random, event_dir: str, title: str, photos: int, photo_size: int,
+                             paragraphs: int) -> None:
+    os.makedirs(event_dir, exist_ok=True)
+
+    # story and photos of non-planned events share one file
+    story = _get_story(rnd=rnd, title=title, paragraphs=paragraphs)
+    photos_page = _get_photos_page(rnd=rnd, title=title, photos=photos)
+    _write(join(event_dir, FILE_STORY), story.replace('</body></html>\n', photos_page + '</body></html>\n'))
+    _write_photos(rnd=rnd, photos_dir=event_dir, photos=photos, photo_size=photo_size)
+
+
+def _get_title(rnd: random.Random, number: int) -> str:
+    return '{} {} {}.{}.'.format(_get_words(rnd=rnd, count=3).capitalize(), number, rnd.randint(1, 28),
+                                 rnd.randint(1, 12))
+
+
+def _get_story(rnd: random.Random, title: str, paragraphs: int) -> str:
+    lines = ['<html><head><style>p {margin-bottom:0}</style></head><body>',
+             '<p>Archív akcií</p>',
+             '<p class=MsoNormal style="text-align:justify">Zápis z akcie {}</p>'.format(title)]
+
+    for _ in range(paragraphs):
+        lines.append('<p class=MsoNormal><span style="font-size:12.0pt">{}&nbsp;&ndash; {}.</span></p>'.format(
+            _get_words(rnd=rnd, count=8).capitalize(), _get_words(rnd=rnd, count=12)))
+
+    lines.append('<p>Daniel Kraic</p>')
+    lines.append('<p>Stránka MKCK - Malokarpatský klub</p>')
+    lines.append('</body></html>')
+    return '\n'.join(lines) + '\n'
+
+
+def _get_photos_page(rnd: random.Random, title: str, photos: int) -> str:
+    lines = ['<p>Foto z akcie {}</p>'.format(title)]
+
+    for i in range(photos):
+        lines.append('<p><img src="fot/{:02d}.jpg" width="640"></p>'.format(i + 1))
+        lines.append('<p>{}</p>'.format(_get_words(rnd=rnd, count=6).capitalize()))
+
+    lines.append('<p>Stránka MKCK - Malokarpatský klub</p>')
+    return '\n'.join(lines) + '\n'
+
+
+def _write_photos(rnd: random.Random, photos_dir: str, photos: int, photo_size: int) -> None:
+    for i in range(photos):
+        for name in ['{:02d}.jpg'.format(i + 1), '{:02d}_tn.jpg'.format(i + 1)]:
+            size = photo_size if not name.endswith('_tn.jpg') else max(1, photo_size // 10)
+            with open(join(photos_dir, name), 'wb') as f:
+                body_size = max(0, size - len(JPEG_HEADER))
+                f.write(JPEG_HEADER + rnd.getrandbits(8 * body_size).to_bytes(body_size, 'little'))
+
+
+def _get_words(rnd: random.Random, count: int) -> str:
+    return ' '.join(rnd.choice(WORDS) for _ in range(count))
+
+
+def _write(path: str, content: str) -> None:
+    with open(path, 'w') as f:
+        f.write(content)
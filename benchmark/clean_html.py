@@ -0,0 +1,105 @@
+import glob
+import re
+import sys
+import time
+from typing import Callable, List
+
+from mkck.config import DIR_DOCS_BASE, FILE_STORY
+from mkck.utils import clean_html
+
+
+def main() -> None:
+    base = sys.argv[1] if len(sys.argv) > 1 else DIR_DOCS_BASE
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    corpus = _read_corpus(base=base)
+    if not corpus:
+        print('No {} files found in {}'.format(FILE_STORY, base))
+        sys.exit(1)
+
+    mismatches = [path for path, content in corpus if clean_html(content) != clean_html_reference(content)]
+    for path in mismatches:
+        print('Output differs: {}'.format(path))
+
+    contents = [content for _, content in corpus]
+    reference = _measure(func=clean_html_reference, contents=contents, rounds=rounds)
+    current = _measure(func=clean_html, contents=contents, rounds=rounds)
+
+    print('files: {}, bytes: {}, rounds: {}'.format(len(contents), sum(len(c) for c in contents), rounds))
+    print('reference: {:.3f} s'.format(reference))
+    print('clean_html: {:.3f} s'.format(current))
+    print('speedup: {:.2f}x'.format(reference / current if current else 0))
+
+    if mismatches:
+        sys.exit(1)
+
+
+def _read_corpus(base: str) -> List[tuple]:
+    res = []
+    for path in sorted(glob.glob('{}/**/{}'.format(base, FILE_STORY), recursive=True)):
+        with open(path, 'r') as f:
+            res.append((path, f.read()))
+    return res
+
+
+def _measure(func: Callable[[str], str], contents: List[str], rounds: int) -> float:
+    best = None
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for content in contents:
+            func(content)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+# clean_html as it was before patterns were precompiled, kept as the reference output
+def clean_html_reference(raw_html: str) -> str:
+    lines_count = len(raw_html.splitlines())
+    if lines_count == 1:
+        raw_html = raw_html.replace('div>', 'div>\n')
+    if lines_count <= 5:
+        raw_html = raw_html.replace('<p>', '\n<p>')
+
+    lines = raw_html.splitlines()
+    tag_if = None
+    tag_endif = None
+    for i, line in enumerate(lines):
+        if not tag_if and line.find('[if gte ') != -1:
+            tag_if = i
+        if line.find('<![endif]') != -1:
+            tag_endif = i
+
+    if tag_if and tag_endif:
+        raw_html = '\n'.join(lines[0:tag_if] + lines[tag_endif+1:])
+
+    re_nbsp = re.compile(r'&nbsp;')
+    re_ndash = re.compile(r'&ndash;')
+    raw_html = re.sub(re_nbsp, ' ', raw_html)
+    raw_html = re.sub(re_ndash, ' ', raw_html)
+
+    raw_html = re.sub(r'(<)?[^<]+margin-bottom[^>]+(>)?', '', raw_html)
+    raw_html = re.sub(r'(<)?[^<]+:justify[^>]+(>)?', '', raw_html)
+    raw_html = re.sub(r'(<)?[^<]+font-[^>]+(>)?', '', raw_html)
+
+    raw_html = re.sub(r'<span[^>]+(>)?', '', raw_html)
+    raw_html = re.sub(r'</span>', '', raw_html)
+
+    raw_html = raw_html.replace('&iacute;', 'í')
+    raw_html = raw_html.replace('&aacute;', 'á')
+
+    re_tags = re.compile(r'<.*?>')
+    re_comments = re.compile(r'<!--.*?-->', flags=re.MULTILINE)
+    re_empty_line = re.compile(r'\n\s*\n', flags=re.MULTILINE)
+    raw_html = re.sub(re_tags, '', raw_html)
+    raw_html = re.sub(re_nbsp, ' ', raw_html)
+    raw_html = re.sub(re_comments, '', raw_html)
+    raw_html = re.sub(re_empty_line, '\n\n', raw_html)
+
+    raw_html = raw_html.replace('<!--', '')
+
+    return raw_html
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,227 @@
+import argparse
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, HTTPServer
+import json
+import re
+from socketserver import ThreadingMixIn
+from threading import Lock, Thread
+import time
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+from xmlrpc.server import SimpleXMLRPCDispatcher
+
+
+RE_REST_PATH = re.compile(r'^/wp-json/wp/v2/(media|posts|pages|categories)(?:/(\d+))?/?$')
+RE_FILENAME = re.compile(r'filename="?([^";]+)"?')
+
+
+class FakeWordpressState(object):
+    def __init__(self) -> None:
+        self.lock: Lock = Lock()
+        self.items: Dict[str, Dict[int, dict]] = {'media': {}, 'posts': {}, 'pages': {}, 'categories': {}}
+        self.last_id: int = 0
+        self.uploaded_bytes: int = 0
+
+    def next_id(self) -> int:
+        self.last_id += 1
+        return self.last_id
+
+    def get_category(self, name: str) -> int:
+        for category in self.items['categories'].values():
+            if category['name'] == name:
+                return category['id']
+
+        category_id = self.next_id()
+        self.items['categories'][category_id] = {'id': category_id, 'name': name, 'slug': name.lower()}
+        return category_id
+
+    def new_post(self, content: dict) -> str:
+        with self.lock:
+            post_id = self.next_id()
+            post_type = 'pages' if content.get('post_type') == 'page' else 'posts'
+            post_date = content.get('post_date') or content.get('post_date_gmt')
+            date = post_date.value if post_date else datetime.now().strftime('%Y%m%dT%H:%M:%S')
+
+            terms = content.get('terms_names', {})
+            self.items[post_type][post_id] = {
+                'id': post_id,
+                'date': datetime.strptime(date, '%Y%m%dT%H:%M:%S').isoformat(),
+                'title': {'rendered': content.get('post_title', '')},
+                'content': {'rendered': content.get('post_content', '')},
+                'link': 'http://localhost/?p={}'.format(post_id),
+                'categories': [self.get_category(name=name) for name in terms.get('category', [])],
+            }
+            return str(post_id)
+
+    def edit_post(self, post_id: int, content: dict) -> bool:
+        with self.lock:
+            for post_type in ['posts', 'pages']:
+                item = self.items[post_type].get(int(post_id))
+                if item:
+                    if 'post_title' in content:
+                        item['title'] = {'rendered': content['post_title']}
+                    if 'post_content' in content:
+                        item['content'] = {'rendered': content['post_content']}
+                    return True
+            return False
+
+
+class FakeWordpressHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+    state: FakeWordpressState = None
+    dispatcher: SimpleXMLRPCDispatcher = None
+    latency: float = 0.0
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self._delay()
+        url = urlparse(self.path)
+        m = RE_REST_PATH.match(url.path)
+        if not m or m.group(2):
+            return self._send_json(status=404, data={'code': 'rest_no_route'})
+
+        params = {k: v[0] for k, v in parse_qs(url.query).items()}
+        with self.state.lock:
+            items = sorted(self.state.items[m.group(1)].values(), key=lambda item: item['id'])
+        items = _filter_items(items=items, params=params)
+
+        per_page = int(params.get('per_page', 10))
+        page = int(params.get('page', 1))
+        total_pages = max(1, (len(items) + per_page - 1) // per_page)
+        headers = {'X-WP-Total': str(len(items)), 'X-WP-TotalPages': str(total_pages)}
+
+        self._send_json(status=200, data=items[(page - 1) * per_page:page * per_page], headers=headers)
+
+    def do_POST(self):
+        self._delay()
+        url = urlparse(self.path)
+        body = self._read_body()
+
+        if url.path.endswith('/xmlrpc.php'):
+            response = self.dispatcher._marshaled_dispatch(body)
+            return self._send(status=200, body=response, content_type='text/xml')
+
+        m = RE_REST_PATH.match(url.path)
+        if not m or m.group(1) != 'media' or m.group(2):
+            return self._send_json(status=404, data={'code': 'rest_no_route'})
+
+        params = {k: v[0] for k, v in parse_qs(url.query).items()}
+        filename = RE_FILENAME.search(self.headers.get('Content-Disposition', ''))
+        with self.state.lock:
+            media_id = self.state.next_id()
+            self.state.uploaded_bytes += len(body)
+            item = {
+                'id': media_id,
+                'date': params.get('date', datetime.now().replace(microsecond=0).isoformat()),
+                'title': {'rendered': params.get('title', '')},
+                'caption': {'rendered': params.get('caption', '')},
+                'media_details': {'sizes': {'full': {'file': filename.group(1) if filename else 'file.jpg'}}},
+            }
+            self.state.items['media'][media_id] = item
+
+        self._send_json(status=201, data=item)
+
+    def do_DELETE(self):
+        self._delay()
+        m = RE_REST_PATH.match(urlparse(self.path).path)
+        if not m or not m.group(2):
+            return self._send_json(status=404, data={'code': 'rest_no_route'})
+
+        with self.state.lock:
+            item = self.state.items[m.group(1)].pop(int(m.group(2)), None)
+
+        if not item:
+            return self._send_json(status=404, data={'code': 'rest_post_invalid_id'})
+        self._send_json(status=200, data={'deleted': True, 'previous': item})
+
+    def _read_body(self) -> bytes:
+        length = int(self.headers.get('Content-Length', 0))
+        return self.rfile.read(length) if length else b''
+
+    def _delay(self) -> None:
+        if self.latency:
+            time.sleep(self.latency)
+
+    def _send_json(self, status: int, data, headers: Optional[Dict[str, str]]=None) -> None:
+        self._send(status=status, body=json.dumps(data).encode('utf-8'), content_type='application/json',
+                   headers=headers)
+
+    def _send(self, status: int, body: bytes, content_type: str, headers: Optional[Dict[str, str]]=None) -> None:
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+class FakeWordpress(object):
+    def __init__(self, latency: float=0.0, port: int=0) -> None:
+        self.state: FakeWordpressState = FakeWordpressState()
+
+        dispatcher = SimpleXMLRPCDispatcher(allow_none=True)
+        dispatcher.register_multicall_functions()
+        dispatcher.register_function(lambda: ['wp.newPost', 'wp.editPost'], 'mt.supportedMethods')
+        dispatcher.register_function(lambda blog_id, username, password, content: self.state.new_post(content),
+                                     'wp.newPost')
+        dispatcher.register_function(
+            lambda blog_id, username, password, post_id, content: self.state.edit_post(post_id, content),
+            'wp.editPost')
+
+        handler = type('Handler', (FakeWordpressHandler,), {
+            'state': self.state,
+            'dispatcher': dispatcher,
+            'latency': latency,
+        })
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', port), handler)
+        self._thread: Optional[Thread] = None
+
+    @property
+    def url(self) -> str:
+        return 'http://127.0.0.1:{}'.format(self._server.server_address[1])
+
+    def start(self) -> None:
+        self._thread = Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def serve_forever(self) -> None:
+        self._server.serve_forever()
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def _filter_items(items: List[dict], params: Dict[str, str]) -> List[dict]:
+    if 'after' in params:
+        items = [item for item in items if 'date' not in item or item['date'] > params['after']]
+    if 'before' in params:
+        items = [item for item in items if 'date' not in item or item['date'] < params['before']]
+    if 'search' in params:
+        search = params['search'].lower()
+        items = [item for item in items if search in json.dumps(item, ensure_ascii=False).lower()]
+    return items
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Local stand-in for the WordPress REST and XML-RPC API')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--latency', type=float, default=0.0, help='latency per request in sec')
+    args = parser.parse_args()
+
+    server = FakeWordpress(latency=args.latency, port=args.port)
+    print('Fake WordPress at {}'.format(server.url))
+    server.serve_forever()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,46 @@
+import glob
+import sys
+import time
+from typing import Callable, List
+
+from mkck.config import DIR_DOCS_BASE, FILE_PHOTOS
+from mkck.photos import PhotoItem, _get_event_photos_soup, _get_event_photos_stream
+
+
+def main() -> None:
+    base = sys.argv[1] if len(sys.argv) > 1 else DIR_DOCS_BASE
+
+    files = sorted(glob.glob('{}/**/{}'.format(base, FILE_PHOTOS), recursive=True))
+    if not files:
+        print('No {} files found in {}'.format(FILE_PHOTOS, base))
+        sys.exit(1)
+
+    mismatches = 0
+    for file in files:
+        soup = _get_event_photos_soup(file=file)
+        stream = _get_event_photos_stream(file=file)
+        if soup != stream:
+            mismatches += 1
+            print('Output differs: {}\n  soup:   {}\n  stream: {}'.format(file, soup, stream))
+
+    soup_time = _measure(func=_get_event_photos_soup, files=files)
+    stream_time = _measure(func=_get_event_photos_stream, files=files)
+
+    print('files: {}, mismatches: {}'.format(len(files), mismatches))
+    print('soup: {:.3f} s'.format(soup_time))
+    print('stream: {:.3f} s'.format(stream_time))
+    print('speedup: {:.2f}x'.format(soup_time / stream_time if stream_time else 0))
+
+    if mismatches:
+        sys.exit(1)
+
+
+def _measure(func: Callable[[str], List[PhotoItem]], files: List[str]) -> float:
+    start = time.perf_counter()
+    for file in files:
+        func(file=file)
+    return time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    main()
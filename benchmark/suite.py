@@ -0,0 +1,112 @@
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import os
+import shutil
+import tempfile
+import time
+from typing import List
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Import benchmark on a synthetic archive and a fake WordPress')
+    parser.add_argument('--years', type=int, default=2, help='number of generated years')
+    parser.add_argument('--events', type=int, default=20, help='planned events per year')
+    parser.add_argument('--non-planned', type=int, default=3, help='non-planned events per year')
+    parser.add_argument('--photos', type=int, default=10, help='photos per event')
+    parser.add_argument('--photo-size', type=int, default=64 * 1024, help='photo size in bytes')
+    parser.add_argument('--latency', type=float, default=0.01, help='fake WordPress latency per request in sec')
+    parser.add_argument('--parse-workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--upload-workers', type=int, default=4)
+    parser.add_argument('--archive', help='use or create archive in this directory instead of a temporary one')
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix='mkck-bench-')
+    base = args.archive or os.path.join(work_dir, 'akcie')
+
+    # must be set before mkck.config is imported
+    os.environ['MKCK_DOCS_BASE'] = base
+    os.environ['MKCK_PARSE_CACHE_FILE'] = ''
+
+    from benchmark.archive import generate_archive
+    from mkck import metrics
+
+    years = list(range(2010, 2010 + args.years))
+    try:
+        if not os.path.exists(base):
+            start = time.perf_counter()
+            generate_archive(base=base, years=years, events=args.events, non_planned=args.non_planned,
+                             photos=args.photos, photo_size=args.photo_size)
+            print('archive generated in {:.2f} s: {}'.format(time.perf_counter() - start, base))
+
+        metrics.enable_metrics()
+        _bench_parse(years=years, parse_workers=args.parse_workers)
+        _bench_import(years=years, latency=args.latency, upload_workers=args.upload_workers,
+                      journal_file=os.path.join(work_dir, 'journal.sqlite'))
+        _print_stages(summary=metrics.get_summary())
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def _bench_parse(years: List[int], parse_workers: int) -> None:
+    from mkck.year import get_year_events_list
+
+    start = time.perf_counter()
+    events = sum(len(get_year_events_list(year=year)) for year in years)
+    serial = time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=parse_workers) as executor:
+        for year in years:
+            get_year_events_list(year=year, executor=executor)
+    parallel = time.perf_counter() - start
+
+    print('parse: {} events, serial {:.2f} s ({:.1f} events/s), {} processes {:.2f} s ({:.1f} events/s)'.format(
+        events, serial, events / serial, parse_workers, parallel, events / parallel))
+
+
+def _bench_import(years: List[int], latency: float, upload_workers: int, journal_file: str) -> None:
+    from benchmark.fake_wordpress import FakeWordpress
+    from mkck.year import get_year_events_list
+    from wordpress.importer import Importer
+
+    server = FakeWordpress(latency=latency)
+    server.start()
+    try:
+        importer = Importer(url=server.url, username='bench', password='bench', upload_workers=upload_workers,
+                            journal_file=journal_file)
+
+        images, posts = 0, 0
+        upload_time, post_time = 0.0, 0.0
+        start = time.perf_counter()
+        for year in years:
+            events = get_year_events_list(year=year)
+
+            stage_start = time.perf_counter()
+            for event in events:
+                images += len(importer.upload_event_photos(event=event))
+            upload_time += time.perf_counter() - stage_start
+
+            stage_start = time.perf_counter()
+            posts += len(importer.create_event_posts(events=events, year_page=year))
+            post_time += time.perf_counter() - stage_start
+        total = time.perf_counter() - start
+    finally:
+        server.stop()
+
+    print('upload: {} images, {} bytes in {:.2f} s ({:.1f} images/s, {:.1f} MB/s)'.format(
+        images, server.state.uploaded_bytes, upload_time, images / upload_time,
+        server.state.uploaded_bytes / upload_time / 1e6))
+    print('posts: {} posts in {:.2f} s ({:.1f} posts/s)'.format(posts, post_time, posts / post_time))
+    print('import total: {:.2f} s'.format(total))
+
+
+def _print_stages(summary: dict) -> None:
+    print('{:<45} {:>8} {:>7} {:>10} {:>10} {:>12}'.format('stage', 'count', 'errors', 'total s', 'avg ms',
+                                                           'bytes'))
+    for stage, stats in summary['stages'].items():
+        print('{:<45} {:>8} {:>7} {:>10.3f} {:>10.2f} {:>12}'.format(
+            stage, stats['count'], stats['errors'], stats['seconds'], stats['avg_seconds'] * 1000, stats['bytes']))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+import glob
+import html
+import re
+import sys
+import time
+from typing import Callable, List
+
+from mkck.config import DIR_DOCS_BASE, FILE_YEAR
+from mkck.year import YearLink, get_year_links
+
+
+def main() -> None:
+    base = sys.argv[1] if len(sys.argv) > 1 else DIR_DOCS_BASE
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+
+    corpus = _read_corpus(base=base)
+    if not corpus:
+        print('No {} files found in {}'.format(FILE_YEAR, base))
+        sys.exit(1)
+
+    mismatches = 0
+    for path, content in corpus:
+        expected = get_year_links_reference(content=content)
+        actual = get_year_links(content=content)
+        if actual != expected:
+            mismatches += 1
+            print('Links differ: {}'.format(path))
+            for link in expected:
+                if link not in actual:
+                    print('  only in reference: {}'.format(link))
+            for link in actual:
+                if link not in expected:
+                    print('  only in scanner: {}'.format(link))
+
+    contents = [content for _, content in corpus]
+    reference = _measure(func=get_year_links_reference, contents=contents, rounds=rounds)
+    current = _measure(func=get_year_links, contents=contents, rounds=rounds)
+
+    print('files: {}, bytes: {}, rounds: {}, mismatches: {}'.format(
+        len(contents), sum(len(c) for c in contents), rounds, mismatches))
+    print('reference: {:.3f} s'.format(reference))
+    print('get_year_links: {:.3f} s'.format(current))
+    print('speedup: {:.2f}x'.format(reference / current if current else 0))
+
+    # all links on one line, reference patterns backtrack over the whole line and find only the last link
+    one_line = [''.join('<td><a href="akciadet.php?rok=2010&cakcie={0}">Akcia {0}</a></td>'.format(i)
+                        for i in range(1, 201))]
+    reference = _measure(func=get_year_links_reference, contents=one_line, rounds=1)
+    current = _measure(func=get_year_links, contents=one_line, rounds=1)
+    print('one line, 200 links: reference {:.3f} s ({} links), get_year_links {:.3f} s ({} links)'.format(
+        reference, len(get_year_links_reference(content=one_line[0])), current,
+        len(get_year_links(content=one_line[0]))))
+
+    if mismatches:
+        sys.exit(1)
+
+
+def _read_corpus(base: str) -> List[tuple]:
+    res = []
+    for path in sorted(glob.glob('{}/*/{}'.format(base, FILE_YEAR))):
+        with open(path, 'r') as f:
+            res.append((path, f.read()))
+    return res
+
+
+def _measure(func: Callable[..., List[YearLink]], contents: List[str], rounds: int) -> float:
+    best = None
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for content in contents:
+            func(content=content)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+# year file links as they were read by three findall passes, kept as the reference output
+def get_year_links_reference(content: str) -> List[YearLink]:
+    result = []
+
+    links = re.findall(r'<a href.*akciadet.*cakcie=(\d+)[^>]*>([^<]+)<', content)
+    for num, title in links:
+        result.append((int(num), html.unescape(title).replace(u'\xa0', u' '), None))
+
+    links = re.findall(r'<a href.*akciadet.*cakcie=KT[^>]*>([^<]+)<', content)
+    for title in links:
+        result.append((99, html.unescape(title).replace(u'\xa0', u' '), None))
+
+    links = re.findall(r'akciadet.*rok=2per.*cakcie=([^"&]+)[^>]*>([^<]+)<', content)
+    for i, (path, title) in enumerate(links):
+        result.append((100 + i, html.unescape(title).replace(u'\xa0', u' '), path))
+
+    return result
+
+
+if __name__ == '__main__':
+    main()
@@ -1,31 +1,108 @@
-from mkck.year import get_year_events_list
+import argparse
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+import os
+import sys
+from typing import List, Optional
+
+from mkck.config import MAX_REQUESTS, METRICS_JSON_FILE, METRICS_PROMETHEUS_FILE
+from mkck.metrics import enable_metrics, write_report
+from mkck.validate import validate_years, write_validation_report
 from wordpress.importer import Importer
+from wordpress.scheduler import STAGES, YearScheduler
+from wordpress.wxr import export_wxr
+
+
+def parse_years(value: str) -> List[int]:
+    years = []
+    for part in value.split(','):
+        if '-' in part:
+            year_from, year_to = part.split('-', 1)
+            years.extend(range(int(year_from), int(year_to) + 1))
+        else:
+            years.append(int(part))
 
-wp_url = 'http://localhost:8000'
-wp_username = ''
-wp_password = ''
+    return sorted(set(years))
 
-w = Importer(url=wp_url, username=wp_username, password=wp_password)
 
+def parse_stages(value: str) -> List[str]:
+    stages = [stage.strip() for stage in value.split(',') if stage.strip()]
+    unknown = [stage for stage in stages if stage not in STAGES]
+    if unknown:
+        raise argparse.ArgumentTypeError('unknown stages: {}'.format(', '.join(unknown)))
 
-def create_year_posts(year: int) -> None:
-    events = get_year_events_list(year=year)
-    for event in events:
-        # w.upload_post_images(event=event)
-        w.create_event_post(event=event)
+    return stages
 
 
-def remove_year(year: int) -> None:
-    w.remove_year_items(year=year)
+def get_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='Transfer mkck.sk events archive to WordPress')
+    parser.add_argument('years', type=parse_years, help='years to process, e.g. 2004-2010,2015')
+    parser.add_argument('--stages', type=parse_stages, default=['parse', 'upload', 'post', 'year-page'],
+                        help='comma separated stages: {} (default: all but remove)'.format(', '.join(STAGES)))
+    parser.add_argument('--url', default=os.environ.get('MKCK_WP_URL', 'http://localhost:8000'))
+    parser.add_argument('--username', default=os.environ.get('MKCK_WP_USERNAME', ''))
+    parser.add_argument('--password', default=os.environ.get('MKCK_WP_PASSWORD', ''))
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 2,
+                        help='worker budget shared by parsing and uploading')
+    parser.add_argument('--upload-workers', type=int, help='part of the budget used for uploads (default: half)')
+    parser.add_argument('--max-requests', type=int, default=MAX_REQUESTS,
+                        help='ceiling of concurrent WordPress requests (default: {})'.format(MAX_REQUESTS))
+    parser.add_argument('--parse-processes', action='store_true', help='parse in processes instead of threads')
+    parser.add_argument('--pipeline', action='store_true',
+                        help='overlap parse, upload and post stages of events within a year')
+    parser.add_argument('--lookahead', type=int, default=1, help='years parsed ahead of the uploaded year')
+    parser.add_argument('--journal', help='import journal file, makes reruns resumable')
+    parser.add_argument('--media-hashes', help='media content hash index file')
+    parser.add_argument('--optimize', action='store_true', help='resize and recompress images before upload')
+    parser.add_argument('--remove-media', action='store_true', help='remove stage removes media too')
+    parser.add_argument('--metrics', action='store_true', help='write metrics report')
+    parser.add_argument('--wxr', help='export years to this WXR file instead of running the stages')
+    parser.add_argument('--media-url', help='base url of archive files referenced by the WXR export')
+    parser.add_argument('--validate', metavar='REPORT',
+                        help='only validate all events of the years in processes and write JSON report of failures')
+    return parser.parse_args()
 
 
 def main() -> None:
-    year = 2010
+    args = get_args()
+
+    if args.metrics:
+        enable_metrics()
+
+    if args.validate:
+        with ProcessPoolExecutor(max_workers=max(1, args.workers)) as executor:
+            report = validate_years(years=args.years, executor=executor)
+        write_validation_report(report=report, file=args.validate)
+        print('Validated events: {}, failed: {}, errors: {}. Report: {}'.format(
+            report['events'], report['failed_events'], len(report['errors']), args.validate))
+        sys.exit(1 if report['errors'] else 0)
+
+    if args.wxr:
+        export_wxr(file=args.wxr, years=args.years, site_url=args.url,
+                   media_url=args.media_url or '{}/archiv'.format(args.url))
+        return
 
-    create_year_posts(year=year)
-    w.create_year_page(year=year)
+    workers = max(2, args.workers)
+    upload_workers = min(workers - 1, max(1, args.upload_workers or workers // 2))
+    parse_workers = workers - upload_workers
 
-    # remove_year(year=year)
+    parse_executor: Executor = ProcessPoolExecutor(max_workers=parse_workers) if args.parse_processes \
+        else ThreadPoolExecutor(max_workers=parse_workers)
+    # re-encoding is CPU bound, it runs in processes whatever the parse executor is
+    optimize_executor: Optional[Executor] = ProcessPoolExecutor(max_workers=parse_workers) if args.optimize \
+        else None
+    try:
+        importer = Importer(url=args.url, username=args.username, password=args.password,
+                            upload_workers=upload_workers, journal_file=args.journal, optimize=args.optimize,
+                            optimize_executor=optimize_executor, media_hashes_file=args.media_hashes,
+                            max_requests=args.max_requests)
+        YearScheduler(importer=importer, stages=args.stages, parse_executor=parse_executor, lookahead=args.lookahead,
+                      remove_media=args.remove_media, remove_workers=upload_workers, pipeline=args.pipeline,
+                      parse_workers=parse_workers, upload_workers=upload_workers).run(years=args.years)
+    finally:
+        parse_executor.shutdown()
+        if optimize_executor:
+            optimize_executor.shutdown()
+        write_report(json_file=METRICS_JSON_FILE, prometheus_file=METRICS_PROMETHEUS_FILE)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,91 @@
+from functools import wraps
+import hashlib
+import json
+import os
+import sqlite3
+from threading import Lock
+from typing import Any, Callable, List, Optional
+
+from mkck.config import PARSE_CACHE_FILE
+from mkck.debug import debug
+
+
+# bump whenever clean_html, story or photos parsing changes, old entries are ignored then
+PARSE_CACHE_VERSION = 2
+
+
+class ParseCache(object):
+    def __init__(self, file: str) -> None:
+        self._lock = Lock()
+        self._conn = sqlite3.connect(file, timeout=30, check_same_thread=False)
+        self._conn.execute('CREATE TABLE IF NOT EXISTS parse_cache (key TEXT PRIMARY KEY, value TEXT NOT NULL)')
+        self._conn.commit()
+
+    def get(self, kind: str, files: List[str]) -> Optional[Any]:
+        key = _get_key(kind=kind, files=files)
+        with self._lock:
+            row = self._conn.execute('SELECT value FROM parse_cache WHERE key = ?', (key,)).fetchone()
+        if not row:
+            return None
+
+        return json.loads(row[0])
+
+    def set(self, kind: str, files: List[str], value: Any) -> None:
+        key = _get_key(kind=kind, files=files)
+        with self._lock:
+            self._conn.execute('INSERT OR REPLACE INTO parse_cache (key, value) VALUES (?, ?)',
+                               (key, json.dumps(value)))
+            self._conn.commit()
+
+
+_parse_cache: Optional[ParseCache] = None
+_parse_cache_pid: Optional[int] = None
+_parse_cache_lock: Lock = Lock()
+
+
+def get_parse_cache() -> Optional[ParseCache]:
+    global _parse_cache, _parse_cache_pid
+
+    if not PARSE_CACHE_FILE:
+        return None
+
+    # sqlite connections must not be shared with forked worker processes, threads share one connection
+    with _parse_cache_lock:
+        if _parse_cache_pid != os.getpid():
+            _parse_cache = ParseCache(file=PARSE_CACHE_FILE)
+            _parse_cache_pid = os.getpid()
+
+        return _parse_cache
+
+
+def cached(kind: str, decode: Optional[Callable[[Any], Any]]=None, variant: Optional[Callable[[], str]]=None):
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            cache = get_parse_cache()
+            if not cache:
+                return func(*args, **kwargs)
+
+            # variant is read on every call, results of differently configured parsers are cached separately
+            cache_kind = '{}:{}'.format(kind, variant()) if variant else kind
+            files = list(args) + [kwargs[k] for k in sorted(kwargs)]
+            value = cache.get(kind=cache_kind, files=files)
+            if value is not None:
+                debug('cache hit {} {}'.format(cache_kind, files))
+                return decode(value) if decode else value
+
+            value = func(*args, **kwargs)
+            cache.set(kind=cache_kind, files=files, value=value)
+            return value
+        return wrapper
+    return decorator
+
+
+def _get_key(kind: str, files: List[str]) -> str:
+    stamps = []
+    for file in files:
+        st = os.stat(file)
+        stamps.append([file, st.st_mtime_ns, st.st_size])
+
+    data = json.dumps([PARSE_CACHE_VERSION, kind, stamps])
+    return hashlib.sha1(data.encode('utf-8')).hexdigest()
@@ -1,15 +1,32 @@
-DIR_DOCS_BASE = '/Users/danielkraic/work/code/web/mkck-old/unger/web/documents/akcie'
-DIR_DOCS_SPECIAL_BASE = '/Users/danielkraic/work/code/web/mkck-old/unger/web/documents/akcie/2per'
-DIR_PHOTOS_UPLOAD_TMP = '/tmp'
+import os
+
+DIR_DOCS_BASE = os.environ.get('MKCK_DOCS_BASE', '/Users/danielkraic/work/code/web/mkck-old/unger/web/documents/akcie')
+DIR_DOCS_SPECIAL_BASE = DIR_DOCS_BASE + '/2per'
 
 FILE_YEAR = 'akciear.htm.txt'
 FILE_STORY = 'zapis.htm.txt'
 FILE_PHOTOS = 'foto.htm.txt'
 DIR_PHOTOS = 'fot'
 
+# photo manifest parser: 'stream' (html.parser events) or 'soup' (BeautifulSoup tree)
+PHOTOS_PARSER = 'stream'
+
+PARSE_CACHE_FILE = os.environ.get('MKCK_PARSE_CACHE_FILE', '.mkck_parse_cache.sqlite')
+
+# ceiling of concurrent WordPress requests of all pools, the request governor adapts below it
+MAX_REQUESTS = 16
+
+DIR_OPTIMIZED_IMAGES = '.mkck_optimized'
+OPTIMIZE_MAX_EDGE = 2048
+OPTIMIZE_QUALITY = 85
+
 DEBUG = False
 NOTICE = True
 
+METRICS = False
+METRICS_JSON_FILE = 'mkck_metrics.json'
+METRICS_PROMETHEUS_FILE = 'mkck_metrics.prom'
+
 
 EVENTS_WITHOUT_PHOTOS_PER_YEAR = {
     2015: [19],
@@ -0,0 +1,63 @@
+import os
+from os.path import basename, dirname, normpath
+from typing import Dict, Optional, Set
+
+from mkck.metrics import measure
+
+
+class DirIndex(object):
+    def __init__(self, path: str) -> None:
+        self.path: str = path
+        self.exists: bool = True
+        self.files: Set[str] = set()
+        self.dirs: Set[str] = set()
+        self.images: Dict[str, str] = {}
+        self.thumbnails: Set[str] = set()
+
+        try:
+            entries = list(os.scandir(path))
+        except (FileNotFoundError, NotADirectoryError):
+            self.exists = False
+            return
+
+        for entry in entries:
+            name = entry.name
+            if entry.is_dir():
+                self.dirs.add(name)
+            else:
+                self.files.add(name)
+
+            lower_name = name.lower()
+            if lower_name.endswith('_tn.jpg'):
+                self.thumbnails.add(name)
+            elif lower_name.endswith('.jpg'):
+                self.images[name] = name
+
+    def has_file(self, name: str) -> bool:
+        return name in self.files
+
+    def has_dir(self, name: str) -> bool:
+        return name in self.dirs
+
+
+_dir_indexes: Dict[str, DirIndex] = {}
+
+
+def get_dir_index(path: str) -> DirIndex:
+    key = normpath(path)
+
+    index: Optional[DirIndex] = _dir_indexes.get(key)
+    if not index:
+        with measure('photos.dir_index'):
+            index = DirIndex(path=key)
+        _dir_indexes[key] = index
+
+    return index
+
+
+def file_exists(path: str) -> bool:
+    return get_dir_index(path=dirname(path)).has_file(basename(path))
+
+
+def dir_exists(path: str) -> bool:
+    return get_dir_index(path=path).exists
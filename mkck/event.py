@@ -1,12 +1,13 @@
 from datetime import date
-from os.path import isdir, exists
-from typing import Tuple, List, Optional
+from typing import Callable, Tuple, List, Optional
 
 
 from mkck.config import EVENTS_WITHOUT_PHOTOS_PER_YEAR, DIR_PHOTOS, FILE_PHOTOS, FILE_STORY, DIR_DOCS_BASE, \
     DIR_DOCS_SPECIAL_BASE, INVALID_STORY_EVENTS_PER_YEAR
+from mkck.dir_index import dir_exists, file_exists
 from mkck.errors import EventError
 from mkck.gallery import GalleryItem
+from mkck.metrics import timed
 from mkck.photos import get_photos
 from mkck.utils import extract_date
 from mkck.story import get_event_story
@@ -17,7 +18,7 @@ def is_without_photos(year: int, number: int) -> bool:
 
 
 class Event(object):
-    def __init__(self, year: int, number: int, title: str, _date: Optional[date], planned: bool=True,
+    def __init__(self, year: int, number: int, title: str, _date: Optional[date]=None, planned: bool=True,
                  path: Optional[str]=None)\
             -> None:
         self._year: int = year
@@ -25,16 +26,10 @@ class Event(object):
         self._is_planned: bool = planned
         self._path: Optional[str] = path
         self.title: str = title
-        self.date: Optional[date] = _date
-        self._story: str = self._get_story()
-        self.photos: List[GalleryItem] = self._get_photos()
-
-        if not self.date:
-            self.date = extract_date(year=self._year, text=self._story)
-            if not self.date:
-                raise EventError('Failed to get date from event "{}"'.format(self))
-
-        self._validate()
+        self._date: Optional[date] = _date
+        self._story: Optional[str] = None
+        self._photos: Optional[List[GalleryItem]] = None
+        self._is_valid: bool = False
 
     @property
     def year(self) -> int:
@@ -48,11 +43,47 @@ class Event(object):
     def is_planned(self) -> bool:
         return self._is_planned
 
+    @property
+    def path(self) -> Optional[str]:
+        return self._path
+
+    @property
+    def date(self) -> date:
+        if not self._date:
+            # invalid date in title fails only this event, story is read only for events without date in title
+            self._date = extract_date(year=self._year, text=self.title) or \
+                extract_date(year=self._year, text=self.story)
+            if not self._date:
+                raise EventError('Failed to get date from event "{}"'.format(self))
+
+        return self._date
+
+    @property
+    def story(self) -> str:
+        if self._story is None:
+            self._story = self._get_story()
+
+        return self._story
+
+    @property
+    def photos(self) -> List[GalleryItem]:
+        if self._photos is None:
+            self._photos = self._get_photos()
+
+        return self._photos
+
+    def validate(self) -> None:
+        if not self._is_valid:
+            self._validate()
+            self._is_valid = True
+
     def __str__(self):
         planned = '' if self._is_planned else 'MP-'
+        story = '?' if self._story is None else len(self._story)
+        photos = '?' if self._photos is None else len(self._photos)
         return '{year}:{planned}{num} t:{title} d:{date} c:{story} p:{photos}'.format(
-            year=self._year, planned=planned, num=self._number, title=self.title, date=self.date,
-            story=len(self._story), photos=len(self.photos))
+            year=self._year, planned=planned, num=self._number, title=self.title, date=self._date,
+            story=story, photos=photos)
 
     def get_content(self, images: Optional[List[int]]=None) -> str:
         if not images:
@@ -61,7 +92,7 @@ class Event(object):
         return self._get_story_content() + '\n' + _get_gallery_content(images=images)
 
     def _get_story_content(self) -> str:
-        lines = self._story.splitlines()
+        lines = self.story.splitlines()
         if not lines:
             return ''
 
@@ -70,47 +101,80 @@ class Event(object):
 
         return '\n'.join(_format_lines(lines=lines))
 
-    def _validate(self) -> None:
-        try:
-            if self._year < 1990:
-                raise ValueError('Invalid event year {}'.format(self._year))
+    def get_errors(self) -> List[Tuple[str, str]]:
+        errors = []
+        for name, check in self._get_checks():
+            try:
+                check()
+            except (EventError, ValueError, OSError) as error:
+                errors.append((name, str(error)))
 
-            if self._number < 1 \
-                    or (self._is_planned and self._number > 99) \
-                    or (not self._is_planned and self._number < 100):
-                raise ValueError('Invalid event number {}'.format(self._number))
-
-            if len(self.title) < 3:
-                raise ValueError('Invalid event title {}'.format(self.title))
-
-            if len(self._story.splitlines()) < 2 and \
-                    self._number not in INVALID_STORY_EVENTS_PER_YEAR.get(self.year, []):
-                raise ValueError('Invalid event story. Num of lines {}'.format(len(self._story.splitlines())))
-
-            if len(self.photos) == 0 and not is_without_photos(year=self._year, number=self._number):
-                raise ValueError('Invalid event photos. Num of photos {}'.format(len(self.photos)))
+        return errors
 
+    def _validate(self) -> None:
+        try:
+            for _, check in self._get_checks():
+                check()
         except ValueError as error:
             raise EventError('Validation failed. Data: {}. Error: {}'.format(self.__str__(), error))
 
+    def _get_checks(self) -> List[Tuple[str, Callable[[], None]]]:
+        return [
+            ('date', self._check_date),
+            ('year', self._check_year),
+            ('number', self._check_number),
+            ('title', self._check_title),
+            ('story', self._check_story),
+            ('photos', self._check_photos),
+        ]
+
+    def _check_date(self) -> None:
+        # date raises when neither title nor story has one
+        self.date
+
+    def _check_year(self) -> None:
+        if self._year < 1990:
+            raise ValueError('Invalid event year {}'.format(self._year))
+
+    def _check_number(self) -> None:
+        if self._number < 1 \
+                or (self._is_planned and self._number > 99) \
+                or (not self._is_planned and self._number < 100):
+            raise ValueError('Invalid event number {}'.format(self._number))
+
+    def _check_title(self) -> None:
+        if len(self.title) < 3:
+            raise ValueError('Invalid event title {}'.format(self.title))
+
+    def _check_story(self) -> None:
+        if len(self.story.splitlines()) < 2 and \
+                self._number not in INVALID_STORY_EVENTS_PER_YEAR.get(self.year, []):
+            raise ValueError('Invalid event story. Num of lines {}'.format(len(self.story.splitlines())))
+
+    def _check_photos(self) -> None:
+        if len(self.photos) == 0 and not is_without_photos(year=self._year, number=self._number):
+            raise ValueError('Invalid event photos. Num of photos {}'.format(len(self.photos)))
+
+    @timed('event.story')
     def _get_story(self) -> str:
         if self._number in INVALID_STORY_EVENTS_PER_YEAR.get(self._year, []):
             return ''
 
         story_file = self._get_event_story_path()
 
-        if not exists(story_file):
+        if not file_exists(story_file):
             raise EventError('Event story file {} not exist'.format(story_file))
 
         return get_event_story(file=story_file)
 
+    @timed('event.photos')
     def _get_photos(self) -> List[GalleryItem]:
         photos_file, photos_dir = self._get_event_photos_paths()
 
-        if not exists(photos_file):
+        if not file_exists(photos_file):
             raise EventError('Event photos file {} not exist'.format(photos_file))
 
-        if not exists(photos_dir) or not isdir(photos_dir):
+        if not dir_exists(photos_dir):
             raise EventError('Invalid event photos dir {}'.format(photos_dir))
 
         photos_with_desc = get_photos(photos_file=photos_file, photos_dir=photos_dir)
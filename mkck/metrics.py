@@ -0,0 +1,175 @@
+from functools import wraps
+import json
+from threading import Lock
+import time
+from typing import Dict, List, Optional
+
+from mkck.config import METRICS
+
+
+LATENCY_BUCKETS = [0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0]
+
+
+class StageStats(object):
+    def __init__(self) -> None:
+        self.count: int = 0
+        self.errors: int = 0
+        self.seconds: float = 0.0
+        self.bytes: int = 0
+        self.buckets: List[int] = [0] * len(LATENCY_BUCKETS)
+
+    def observe(self, seconds: float, error: bool) -> None:
+        self.count += 1
+        self.seconds += seconds
+        if error:
+            self.errors += 1
+
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if seconds <= bound:
+                self.buckets[i] += 1
+                break
+
+    def to_dict(self) -> dict:
+        return {
+            'count': self.count,
+            'errors': self.errors,
+            'seconds': round(self.seconds, 6),
+            'avg_seconds': round(self.seconds / self.count, 6) if self.count else 0.0,
+            'bytes': self.bytes,
+            'bytes_per_second': round(self.bytes / self.seconds, 1) if self.seconds else 0.0,
+            'latency_buckets': {str(bound): n for bound, n in zip(LATENCY_BUCKETS, self.buckets)},
+        }
+
+
+class _Measure(object):
+    def __init__(self, stage: str, nbytes: int) -> None:
+        self._stage: str = stage
+        self._nbytes: int = nbytes
+        self._start: float = 0.0
+
+    def __enter__(self) -> '_Measure':
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> bool:
+        observe(stage=self._stage, seconds=time.perf_counter() - self._start, nbytes=self._nbytes,
+                error=exc_type is not None)
+        return False
+
+
+class _NoMeasure(object):
+    def __enter__(self) -> '_NoMeasure':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> bool:
+        return False
+
+
+_NO_MEASURE = _NoMeasure()
+
+_enabled: bool = METRICS
+_lock: Lock = Lock()
+_stages: Dict[str, StageStats] = {}
+_started: float = time.time()
+
+
+def enable_metrics(enabled: bool=True) -> None:
+    global _enabled
+    _enabled = enabled
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def measure(stage: str, nbytes: int=0):
+    if not _enabled:
+        return _NO_MEASURE
+
+    return _Measure(stage=stage, nbytes=nbytes)
+
+
+def timed(stage: str):
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+
+            with _Measure(stage=stage, nbytes=0):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def observe(stage: str, seconds: float, nbytes: int=0, error: bool=False) -> None:
+    if not _enabled:
+        return
+
+    with _lock:
+        stats = _stages.get(stage)
+        if not stats:
+            stats = _stages[stage] = StageStats()
+        stats.observe(seconds=seconds, error=error)
+        stats.bytes += nbytes
+
+
+def add_bytes(stage: str, nbytes: int) -> None:
+    if not _enabled:
+        return
+
+    with _lock:
+        stats = _stages.get(stage)
+        if not stats:
+            stats = _stages[stage] = StageStats()
+        stats.bytes += nbytes
+
+
+def get_summary() -> dict:
+    with _lock:
+        return {
+            'started': _started,
+            'elapsed_seconds': round(time.time() - _started, 3),
+            'stages': {stage: stats.to_dict() for stage, stats in sorted(_stages.items())},
+        }
+
+
+def write_report(json_file: Optional[str]=None, prometheus_file: Optional[str]=None) -> None:
+    if not _enabled:
+        return
+
+    summary = get_summary()
+
+    if json_file:
+        with open(json_file, 'w') as f:
+            json.dump(summary, f, indent=2, sort_keys=True)
+
+    if prometheus_file:
+        with open(prometheus_file, 'w') as f:
+            f.write(_format_prometheus(summary=summary))
+
+
+def _format_prometheus(summary: dict) -> str:
+    lines = [
+        '# TYPE mkck_stage_requests_total counter',
+        '# TYPE mkck_stage_errors_total counter',
+        '# TYPE mkck_stage_bytes_total counter',
+        '# TYPE mkck_stage_seconds histogram',
+    ]
+
+    for stage, stats in summary['stages'].items():
+        label = 'stage="{}"'.format(stage.replace('"', '\\"'))
+        lines.append('mkck_stage_requests_total{{{}}} {}'.format(label, stats['count']))
+        lines.append('mkck_stage_errors_total{{{}}} {}'.format(label, stats['errors']))
+        lines.append('mkck_stage_bytes_total{{{}}} {}'.format(label, stats['bytes']))
+
+        cumulative = 0
+        for bound, n in stats['latency_buckets'].items():
+            cumulative += n
+            lines.append('mkck_stage_seconds_bucket{{{},le="{}"}} {}'.format(label, bound, cumulative))
+        lines.append('mkck_stage_seconds_bucket{{{},le="+Inf"}} {}'.format(label, stats['count']))
+        lines.append('mkck_stage_seconds_sum{{{}}} {}'.format(label, stats['seconds']))
+        lines.append('mkck_stage_seconds_count{{{}}} {}'.format(label, stats['count']))
+
+    lines.append('mkck_run_elapsed_seconds {}'.format(summary['elapsed_seconds']))
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,75 @@
+from collections import namedtuple
+from concurrent.futures import Executor
+import copy
+import os
+from os.path import exists, getsize, join
+from typing import List, Optional
+
+from PIL import Image, ImageOps, JpegImagePlugin
+
+from mkck.config import DIR_OPTIMIZED_IMAGES, OPTIMIZE_MAX_EDGE, OPTIMIZE_QUALITY
+from mkck.debug import debug, notice
+from mkck.gallery import GalleryItem
+from mkck.utils import hash_file
+
+
+# bump whenever the produced images change, old optimized images are ignored then
+OPTIMIZE_CACHE_VERSION = 2
+
+OptimizedImage = namedtuple('OptimizedImage', ['path', 'source_size', 'size', 'cached'])
+
+
+def optimize_images(images: List[GalleryItem], executor: Optional[Executor]=None) -> List[GalleryItem]:
+    paths = [image.path for image in images]
+    if executor:
+        results = list(executor.map(optimize_image, paths))
+    else:
+        results = [optimize_image(path) for path in paths]
+
+    source_size = sum(result.source_size for result in results)
+    size = sum(result.size for result in results)
+    cached = sum(1 for result in results if result.cached)
+    notice('Optimized {} images ({} cached). {} -> {} bytes, saved {} bytes'.format(
+        len(results), cached, source_size, size, source_size - size))
+
+    res = []
+    for image, result in zip(images, results):
+        optimized = copy.copy(image)
+        optimized.path = result.path
+        res.append(optimized)
+
+    return res
+
+
+def optimize_image(path: str) -> OptimizedImage:
+    source_size = getsize(path)
+    dst = join(DIR_OPTIMIZED_IMAGES, '{}.jpg'.format(_get_image_key(path=path)))
+
+    if exists(dst):
+        return OptimizedImage(path=dst, source_size=source_size, size=getsize(dst), cached=True)
+
+    os.makedirs(DIR_OPTIMIZED_IMAGES, exist_ok=True)
+    tmp = '{}.{}.tmp'.format(dst, os.getpid())
+
+    with Image.open(path) as src:
+        # orientation is applied to pixels, because all metadata including EXIF is dropped on save
+        img = ImageOps.exif_transpose(src)
+        if img.mode != 'RGB':
+            img = img.convert('RGB')
+        img.thumbnail((OPTIMIZE_MAX_EDGE, OPTIMIZE_MAX_EDGE), Image.LANCZOS)
+        img.save(tmp, format='JPEG', quality=OPTIMIZE_QUALITY, optimize=True, progressive=True)
+
+        # jpeg already compressed more than OPTIMIZE_QUALITY is re-saved with its own quantization tables,
+        # so it is not made bigger and still has no metadata
+        if getsize(tmp) >= source_size and src.format == 'JPEG':
+            img.save(tmp, format='JPEG', qtables=src.quantization, subsampling=JpegImagePlugin.get_sampling(src),
+                     optimize=True, progressive=True)
+
+    os.replace(tmp, dst)
+    debug('optimized img "{}" -> "{}"'.format(path, dst))
+
+    return OptimizedImage(path=dst, source_size=source_size, size=getsize(dst), cached=False)
+
+
+def _get_image_key(path: str) -> str:
+    return hash_file(path=path, stamp='{}:{}:{}'.format(OPTIMIZE_CACHE_VERSION, OPTIMIZE_MAX_EDGE, OPTIMIZE_QUALITY))
@@ -1,52 +1,77 @@
 from collections import namedtuple
+from html.entities import name2codepoint
+from html.parser import HTMLParser
 from os.path import join
-from typing import List, Optional
+from typing import Iterable, Iterator, List, Optional, Tuple
 
 from bs4 import BeautifulSoup, Tag
 
-from mkck.utils import find_files
+from mkck.cache import cached
+from mkck.config import PHOTOS_PARSER
+from mkck.dir_index import get_dir_index
+from mkck.errors import EventError
+from mkck.metrics import timed
 
 
 PhotoItem = namedtuple('Photo', ['path', 'desc'])
 
 
+@cached(kind='photos', decode=lambda items: [PhotoItem(*item) for item in items], variant=lambda: PHOTOS_PARSER)
 def get_photos(photos_file: str, photos_dir: str) -> List[PhotoItem]:
     photos_with_desc = _get_event_photos(file=photos_file)
 
-    photo_files_all = find_files(which='*.jpg', where=photos_dir)
-    photo_files_fn = find_files(which='*_tn.jpg', where=photos_dir)
-    photo_files = {p.split('/')[-1]: p for p in photo_files_all if p not in photo_files_fn}
+    photo_files = get_dir_index(path=photos_dir).images
+
+    missing = [photo.path for photo in photos_with_desc if photo.path not in photo_files]
+    if missing:
+        raise EventError('Photos {} from {} not found in {}'.format(', '.join(missing), photos_file, photos_dir))
 
     photos_with_desc = [PhotoItem(path=join(photos_dir, photo_files.get(photo.path)), desc=photo.desc)
                         for photo in photos_with_desc]
     return photos_with_desc
 
 
+@timed('photos.manifest')
 def _get_event_photos(file: str) -> List[PhotoItem]:
-    res = []
+    if PHOTOS_PARSER == 'soup':
+        return _get_event_photos_soup(file=file)
+
+    return _get_event_photos_stream(file=file)
+
 
+def _get_event_photos_soup(file: str) -> List[PhotoItem]:
     with open(file, 'r') as f:
-        last_img = None
         soup = BeautifulSoup(f.read(), 'html.parser')
 
-        for sibling in soup.p.next_siblings:
-            if not isinstance(sibling, Tag):
-                continue
+        siblings = ((_get_img(sibling), sibling.text)
+                    for sibling in soup.p.next_siblings
+                    if isinstance(sibling, Tag))
+
+        return _get_photo_items(siblings=siblings)
+
+
+def _get_event_photos_stream(file: str) -> List[PhotoItem]:
+    return _get_photo_items(siblings=_iter_siblings(file=file))
+
 
-            img = _get_img(sibling)
-            if img:
+def _get_photo_items(siblings: Iterable[Tuple[Optional[str], str]]) -> List[PhotoItem]:
+    res = []
+    last_img = None
+
+    for img, text in siblings:
+        if img:
+            if last_img:
+                res.append(PhotoItem(path=last_img, desc=''))
+
+            last_img = img.split('/')[-1]
+        else:
+            description = str(text).replace(u'\xa0', u' ').strip()
+            if description and description != '' and not description.startswith('Stránka MKCK '):
                 if last_img:
-                    res.append(PhotoItem(path=last_img, desc=''))
-
-                last_img = img.split('/')[-1]
-            else:
-                description = str(sibling.text).replace(u'\xa0', u' ').strip()
-                if description and description != '' and not description.startswith('Stránka MKCK '):
-                    if last_img:
-                        description = description.splitlines()[0]
-                        res.append(PhotoItem(path=last_img, desc=description))
-                        # debug('img: {} {}'.format(last_img, description))
-                        last_img = None
+                    description = description.splitlines()[0]
+                    res.append(PhotoItem(path=last_img, desc=description))
+                    # debug('img: {} {}'.format(last_img, description))
+                    last_img = None
 
     if last_img:
         res.append(PhotoItem(path=last_img, desc=''))
@@ -65,3 +90,157 @@ def _get_img(element) -> Optional[str]:
         return src
 
     return None
+
+
+def _iter_siblings(file: str, chunk_size: int=64 * 1024) -> Iterator[Tuple[Optional[str], str]]:
+    parser = SiblingsParser()
+
+    with open(file, 'r') as f:
+        for chunk in iter(lambda: f.read(chunk_size), ''):
+            parser.feed(chunk)
+            yield from parser.pop_siblings()
+            if parser.done:
+                return
+
+    parser.finish()
+    yield from parser.pop_siblings()
+
+
+# emits (img src, text) of every element following the first <p>, same as soup.p.next_siblings with the
+# pinned beautifulsoup4 4.6.0 html.parser tree builder, including its handling of stray end tags
+class SiblingsParser(HTMLParser):
+
+    VOID_TAGS = {'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'keygen', 'link', 'menuitem', 'meta',
+                 'param', 'source', 'track', 'wbr', 'spacer', 'frame'}
+    PRESERVE_WHITESPACE_TAGS = {'pre', 'textarea'}
+    ASCII_SPACES = {ord(c): None for c in '\x20\x0a\x09\x0c\x0d'}
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=False)
+        self._stack: List[str] = []
+        self._closed_void: List[str] = []
+        self._data: List[str] = []
+        self._depth: Optional[int] = None
+        self._done: bool = False
+        self._in_sibling: bool = False
+        self._img: Optional[str] = None
+        self._has_img: bool = False
+        self._text: List[str] = []
+        self._siblings: List[Tuple[Optional[str], str]] = []
+
+    @property
+    def done(self) -> bool:
+        return self._done
+
+    def pop_siblings(self) -> List[Tuple[Optional[str], str]]:
+        siblings, self._siblings = self._siblings, []
+        return siblings
+
+    def handle_starttag(self, tag, attrs, close_void=True):
+        self._flush_data()
+        if self._done:
+            return
+
+        if self._depth is None:
+            if tag == 'p':
+                self._depth = len(self._stack)
+        elif len(self._stack) == self._depth:
+            self._in_sibling = True
+            self._has_img = False
+            self._img = None
+            self._text = []
+        elif self._in_sibling and tag == 'img' and not self._has_img:
+            self._has_img = True
+            self._img = dict(attrs).get('src') or None
+
+        self._stack.append(tag)
+
+        # void tags are closed right away, their explicit end tag is ignored later
+        if close_void and tag in self.VOID_TAGS:
+            self._pop_to(tag)
+            self._closed_void.append(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs, close_void=False)
+        self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        # ignored end tag does not split the surrounding text
+        if tag in self._closed_void:
+            self._closed_void.remove(tag)
+            return
+
+        self._flush_data()
+        if self._done:
+            return
+
+        self._pop_to(tag)
+
+    def handle_data(self, data):
+        self._data.append(data)
+
+    def handle_charref(self, name):
+        try:
+            data = chr(int(name[1:], 16) if name[:1] in ('x', 'X') else int(name))
+        except (ValueError, OverflowError):
+            data = u'\N{REPLACEMENT CHARACTER}'
+        self.handle_data(data)
+
+    def handle_entityref(self, name):
+        # only HTML 4 entity names are resolved, others are kept as text
+        codepoint = name2codepoint.get(name)
+        self.handle_data(chr(codepoint) if codepoint is not None else '&{};'.format(name))
+
+    def handle_comment(self, data):
+        self._flush_data()
+
+    def handle_decl(self, decl):
+        self._flush_data()
+
+    def handle_pi(self, data):
+        self._flush_data()
+
+    def unknown_decl(self, data):
+        self._flush_data()
+        if data.upper().startswith('CDATA['):
+            self.handle_data(data[len('CDATA['):])
+            self._flush_data()
+
+    def finish(self) -> None:
+        # bs4 4.6.0 never closes the parser, incomplete markup at the end of the document is dropped
+        self._flush_data()
+        self._end_sibling()
+
+    def _pop_to(self, tag: str) -> None:
+        # like bs4 4.6.0, an end tag without matching open tag closes every open tag
+        while self._stack:
+            if self._stack.pop() == tag:
+                break
+
+        if self._depth is None:
+            return
+
+        if len(self._stack) <= self._depth:
+            self._end_sibling()
+
+        if len(self._stack) < self._depth:
+            self._done = True
+
+    def _flush_data(self) -> None:
+        if not self._data:
+            return
+
+        data = ''.join(self._data)
+        self._data = []
+
+        # whitespace only strings are collapsed, same as bs4 does
+        if not data.translate(self.ASCII_SPACES) and not self.PRESERVE_WHITESPACE_TAGS.intersection(self._stack):
+            data = '\n' if '\n' in data else ' '
+
+        if self._in_sibling:
+            self._text.append(data)
+
+    def _end_sibling(self) -> None:
+        if self._in_sibling:
+            self._in_sibling = False
+            self._siblings.append((self._img, ''.join(self._text)))
@@ -0,0 +1,49 @@
+from threading import Lock
+import time
+
+from mkck.debug import notice
+
+
+class Progress(object):
+    def __init__(self, total: int, min_interval: float=1.0) -> None:
+        self._lock: Lock = Lock()
+        self._total: int = total
+        self._done: int = 0
+        self._started: float = time.perf_counter()
+        self._printed: float = 0.0
+        self._min_interval: float = min_interval
+
+    def add_total(self, count: int) -> None:
+        with self._lock:
+            self._total += count
+
+    def advance(self, label: str, count: int=1) -> None:
+        with self._lock:
+            self._done += count
+            now = time.perf_counter()
+            # last unit is always printed
+            if now - self._printed < self._min_interval and self._done < self._total:
+                return
+            self._printed = now
+            line = self._format_line(label=label, elapsed=now - self._started)
+
+        notice(line)
+
+    def _format_line(self, label: str, elapsed: float) -> str:
+        rate = self._done / elapsed if elapsed > 0 else 0.0
+        remaining = max(0, self._total - self._done)
+        eta = _format_duration(remaining / rate) if rate > 0 else '?'
+
+        return '[{}] {}/{} ({:.0%}), {:.2f} units/s, elapsed {}, ETA {}'.format(
+            label, self._done, self._total, self._done / self._total if self._total else 1.0, rate,
+            _format_duration(elapsed), eta)
+
+
+def _format_duration(seconds: float) -> str:
+    seconds = int(seconds)
+    hours, seconds = divmod(seconds, 3600)
+    minutes, seconds = divmod(seconds, 60)
+
+    if hours:
+        return '{}h{:02d}m{:02d}s'.format(hours, minutes, seconds)
+    return '{}m{:02d}s'.format(minutes, seconds)
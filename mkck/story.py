@@ -1,13 +1,18 @@
 from typing import List
 
+from mkck.cache import cached
 from mkck.debug import debug
 from mkck.errors import EventError
+from mkck.metrics import measure
 from mkck.utils import clean_html
 
 
+@cached(kind='story')
 def get_event_story(file: str) -> str:
     with open(file, 'r') as f:
-        event_story = clean_html(f.read())
+        raw_html = f.read()
+        with measure('story.clean_html', nbytes=len(raw_html)):
+            event_story = clean_html(raw_html)
         lines = [line.strip() for line in event_story.splitlines()]
         lines = [line for line in lines if line not in ['', '.', 'menu pre zapis', '<!--']]
 
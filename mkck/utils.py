@@ -1,9 +1,21 @@
 from datetime import date, datetime
-import fnmatch
+import hashlib
 import html
-import os
 import re
-from typing import List, Optional
+from typing import Optional
+
+
+RE_ENTITIES_SPACE = re.compile(r'&nbsp;|&ndash;')
+RE_NBSP = re.compile(r'&nbsp;')
+RE_STYLES = [
+    ('margin-bottom', re.compile(r'(<)?[^<]+margin-bottom[^>]+(>)?')),
+    (':justify', re.compile(r'(<)?[^<]+:justify[^>]+(>)?')),
+    ('font-', re.compile(r'(<)?[^<]+font-[^>]+(>)?')),
+]
+RE_SPAN_OPEN = re.compile(r'<span[^>]+(>)?')
+RE_TAGS = re.compile(r'<.*?>')
+RE_COMMENTS = re.compile(r'<!--.*?-->', flags=re.MULTILINE)
+RE_EMPTY_LINE = re.compile(r'\n\s*\n', flags=re.MULTILINE)
 
 
 def clean_html(raw_html: str) -> str:
@@ -13,50 +25,50 @@ def clean_html(raw_html: str) -> str:
     if lines_count <= 5:
         raw_html = raw_html.replace('<p>', '\n<p>')
 
-    lines = raw_html.splitlines()
-    tag_if = None
-    tag_endif = None
-    for i, line in enumerate(lines):
-        if not tag_if and line.find('[if gte ') != -1:
-            tag_if = i
-        if line.find('<![endif]') != -1:
-            tag_endif = i
-
-    if tag_if and tag_endif:
-        raw_html = '\n'.join(lines[0:tag_if] + lines[tag_endif+1:])
+    if '[if gte ' in raw_html:
+        raw_html = _remove_conditional_comments(raw_html=raw_html)
 
-    re_nbsp = re.compile(r'&nbsp;')
-    re_ndash = re.compile(r'&ndash;')
-    raw_html = re.sub(re_nbsp, ' ', raw_html)
-    raw_html = re.sub(re_ndash, ' ', raw_html)
-    # raw_html = re.sub(re_lsd, ' ', raw_html)
+    # every pass is skipped when its pattern can not match, style patterns backtrack a lot on long lines
+    raw_html = RE_ENTITIES_SPACE.sub(' ', raw_html)
 
-    raw_html = re.sub(r'(<)?[^<]+margin-bottom[^>]+(>)?', '', raw_html)
-    raw_html = re.sub(r'(<)?[^<]+:justify[^>]+(>)?', '', raw_html)
-    raw_html = re.sub(r'(<)?[^<]+font-[^>]+(>)?', '', raw_html)
+    for needle, re_style in RE_STYLES:
+        if needle in raw_html:
+            raw_html = re_style.sub('', raw_html)
 
-    raw_html = re.sub(r'<span[^>]+(>)?', '', raw_html)
-    raw_html = re.sub(r'</span>', '', raw_html)
+    if '<span' in raw_html:
+        raw_html = RE_SPAN_OPEN.sub('', raw_html)
+    raw_html = raw_html.replace('</span>', '')
 
     raw_html = raw_html.replace('&iacute;', 'í')
     raw_html = raw_html.replace('&aacute;', 'á')
 
-    re_tags = re.compile(r'<.*?>')
-    re_comments = re.compile(r'<!--.*?-->', flags=re.MULTILINE)
-    re_empty_line = re.compile(r'\n\s*\n', flags=re.MULTILINE)
-    raw_html = re.sub(re_tags, '', raw_html)
-    raw_html = re.sub(re_nbsp, ' ', raw_html)
-    raw_html = re.sub(re_comments, '', raw_html)
-    raw_html = re.sub(re_empty_line, '\n\n', raw_html)
+    if '<' in raw_html:
+        raw_html = RE_TAGS.sub('', raw_html)
+    if '&nbsp;' in raw_html:
+        raw_html = RE_NBSP.sub(' ', raw_html)
+    if '<!--' in raw_html:
+        raw_html = RE_COMMENTS.sub('', raw_html)
+    raw_html = RE_EMPTY_LINE.sub('\n\n', raw_html)
 
     raw_html = raw_html.replace('<!--', '')
 
     return raw_html
 
 
-def find_files(which: str, where: str='.') -> List[str]:
-    rule = re.compile(fnmatch.translate(which), re.IGNORECASE)
-    return [name for name in os.listdir(where) if rule.match(name)]
+def _remove_conditional_comments(raw_html: str) -> str:
+    lines = raw_html.splitlines()
+    tag_if = None
+    tag_endif = None
+    for i, line in enumerate(lines):
+        if not tag_if and line.find('[if gte ') != -1:
+            tag_if = i
+        if line.find('<![endif]') != -1:
+            tag_endif = i
+
+    if tag_if and tag_endif:
+        return '\n'.join(lines[0:tag_if] + lines[tag_endif+1:])
+
+    return raw_html
 
 
 def extract_date(year: int, text: str) -> Optional[date]:
@@ -74,4 +86,21 @@ def format_iso_date(iso_date: str) -> str:
         return ''
 
     dt = datetime.strptime(iso_date, "%Y-%m-%dT%H:%M:%S")
-    return ' ({}.{}.)'.format(dt.day, dt.month)
+    return format_date(dt.date())
+
+
+def format_date(d: Optional[date]) -> str:
+    if not d:
+        return ''
+
+    return ' ({}.{}.)'.format(d.day, d.month)
+
+
+def hash_file(path: str, stamp: str='') -> str:
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            h.update(chunk)
+
+    h.update(stamp.encode('utf-8'))
+    return h.hexdigest()
@@ -0,0 +1,60 @@
+from concurrent.futures import Executor
+import json
+from typing import List, Optional, Tuple
+
+from mkck.debug import notice
+from mkck.errors import EventError
+from mkck.year import get_year_index
+
+
+def validate_years(years: List[int], executor: Optional[Executor]=None) -> dict:
+    # one task per year, events of a year share the year's directory index
+    if executor:
+        results = list(executor.map(validate_year, years))
+    else:
+        results = [validate_year(year=year) for year in years]
+
+    errors = [error for year_errors, _ in results for error in year_errors]
+    failed_events = {(error['year'], error['number'], error['planned']) for error in errors if error['number']}
+
+    return {
+        'years': years,
+        'events': sum(events for _, events in results),
+        'failed_events': len(failed_events),
+        'errors': errors,
+    }
+
+
+def validate_year(year: int) -> Tuple[List[dict], int]:
+    try:
+        events = get_year_index(year=year)
+    except (EventError, ValueError, OSError) as error:
+        notice('Year {}: {}'.format(year, error))
+        return [_get_error(year=year, check='year', message=str(error))], 0
+
+    errors = []
+    for event in events:
+        for check, message in event.get_errors():
+            errors.append(_get_error(year=year, check=check, message=message, number=event.event_number,
+                                     planned=event.is_planned, path=event.path, title=event.title))
+
+    notice('Year {}: events {}, errors {}'.format(year, len(events), len(errors)))
+    return errors, len(events)
+
+
+def write_validation_report(report: dict, file: str) -> None:
+    with open(file, 'w') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+
+
+def _get_error(year: int, check: str, message: str, number: Optional[int]=None, planned: bool=True,
+               path: Optional[str]=None, title: Optional[str]=None) -> dict:
+    return {
+        'year': year,
+        'number': number,
+        'planned': planned,
+        'path': path,
+        'title': title,
+        'check': check,
+        'message': message,
+    }
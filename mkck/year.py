@@ -1,15 +1,41 @@
+from concurrent.futures import Executor
 import html
 from os.path import exists
 import re
-from typing import List
+from typing import List, Optional, Tuple
 
 from mkck.event import Event
 from mkck.config import DIR_DOCS_BASE, FILE_YEAR, EVENTS_TO_SKIP_PER_YEAR
+from mkck.debug import notice
 from mkck.errors import EventError
-from mkck.utils import extract_date
+from mkck.metrics import measure, timed
 
 
-def get_year_events_list(year: int) -> List[Event]:
+# (event number, title, path of non-planned event)
+YearLink = Tuple[int, str, Optional[str]]
+
+RE_YEAR_LINK = re.compile(r'<a\s([^>]*)>([^<]+)<', flags=re.IGNORECASE)
+RE_HREF = re.compile(r'href\s*=\s*("[^"]*"|\'[^\']*\'|[^\s>]+)', flags=re.IGNORECASE)
+RE_EVENT_ID = re.compile(r'cakcie=([^"&>\s]+)')
+RE_NUMBER = re.compile(r'\d+')
+
+
+@timed('year.events')
+def get_year_events_list(year: int, index_only: bool=False, executor: Optional[Executor]=None) -> List[Event]:
+    events = get_year_index(year=year)
+
+    # in index only mode story and photos are parsed only for events without date in title
+    if not index_only:
+        if executor:
+            events = _parse_events_parallel(events=events, executor=executor)
+        else:
+            for event in events:
+                event.validate()
+
+    return sorted(events, key=lambda item: item.date)
+
+
+def get_year_index(year: int) -> List[Event]:
     year_file = _get_year_file_path(year)
     if not exists(year_file):
         raise EventError('File {} not exist'.format(year_file))
@@ -17,54 +43,80 @@ def get_year_events_list(year: int) -> List[Event]:
     return _read_year_file(year=year, file=year_file)
 
 
+def _parse_events_parallel(events: List[Event], executor: Executor) -> List[Event]:
+    futures = [executor.submit(parse_event, event) for event in events]
+
+    result = []
+    errors = []
+    for event, future in zip(events, futures):
+        try:
+            result.append(future.result())
+        except EventError as error:
+            notice('Failed to parse event {}. Error: {}'.format(event, error))
+            errors.append(error)
+
+    if errors:
+        raise errors[0]
+
+    return result
+
+
+def parse_event(event: Event) -> Event:
+    event.validate()
+    return event
+
+
 def _get_year_file_path(year: int) -> str:
     return '{}/{}/{}'.format(DIR_DOCS_BASE, year, FILE_YEAR)
 
 
 def _read_year_file(year: int, file: str) -> List[Event]:
-    with open(file, 'r') as f:
-        return _get_events(year=year, content=f.read())
+    with measure('year.read_file'):
+        with open(file, 'r') as f:
+            return _get_events(year=year, content=f.read())
 
 
 def _get_events(year: int, content: str) -> List[Event]:
     result = []
 
-    # process all links
-    links = re.findall(r'<a href.*akciadet.*cakcie=(\d+)[^>]*>([^<]+)<', content)
-    for link in links:
-        num, title = link
-        title = html.unescape(title)
-        title = title.replace(u'\xa0', u' ')
-
-        if _skip_event(year=year, event_number=int(num)):
+    for num, title, path in get_year_links(content=content):
+        if path is None and _skip_event(year=year, event_number=num):
             continue
 
-        event = Event(year=year, number=int(num), title=title, _date=extract_date(year=year, text=title))
+        event = Event(year=year, number=num, title=title, planned=path is None, path=path)
         result.append(event)
 
-    # process links for KT
-    links = re.findall(r'<a href.*akciadet.*cakcie=KT[^>]*>([^<]+)<', content)
-    for link in links:
-        num, title = 99, link
-        title = html.unescape(title)
-        title = title.replace(u'\xa0', u' ')
+    return result
 
-        event = Event(year=year, number=int(num), title=title, _date=extract_date(year=year, text=title))
-        result.append(event)
 
-    # process links for non-planned events
-    links = re.findall(r'akciadet.*rok=2per.*cakcie=([^"&]+)[^>]*>([^<]+)<', content)
-    for i, link in enumerate(links):
-        path, title = link
-        num = 100 + i
-        title = html.unescape(title)
-        title = title.replace(u'\xa0', u' ')
+def get_year_links(content: str) -> List[YearLink]:
+    planned, kt, non_planned = [], [], []
 
-        event = Event(year=year, number=num, title=title, _date=extract_date(year=year, text=title), planned=False,
-                      path=path)
-        result.append(event)
+    # one pass over anchors, numbered, KT and non-planned links keep their original order in the result
+    for m in RE_YEAR_LINK.finditer(content):
+        href = RE_HREF.search(m.group(1))
+        if not href or 'akciadet' not in href.group(1):
+            continue
+
+        href = href.group(1).strip('"\'')
+
+        event_id = RE_EVENT_ID.search(href)
+        if not event_id:
+            continue
+
+        title = html.unescape(m.group(2)).replace(u'\xa0', u' ')
+        event_id = event_id.group(1)
+
+        if 'rok=2per' in href:
+            non_planned.append((100 + len(non_planned), title, event_id))
+        elif event_id.startswith('KT'):
+            kt.append((99, title, None))
+        else:
+            num = RE_NUMBER.match(event_id)
+            if num:
+                planned.append((int(num.group(0)), title, None))
 
-    return sorted(result, key=lambda item: item.date)
+    return planned + kt + non_planned
 
 
 def _skip_event(year: int, event_number: int) -> bool:
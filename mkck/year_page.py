@@ -1,8 +1,12 @@
-from typing import List
+import html
+from typing import Dict, List, Tuple
 from collections import namedtuple
 
 from jinja2 import Template
 
+from mkck.event import Event
+from mkck.utils import format_date
+
 
 EventLink = namedtuple('Event', ['event_number', 'title', 'link', 'date'])
 
@@ -45,8 +49,25 @@ def _get_events_paragraph(events: List[EventLink]) -> str:
     if not events:
         return ''
 
-    res = ''
-    for event in events:
-        res += '{event_number}. <a href="{link}">{title}{date}</a><br />'.format(
-            event_number=event.event_number, link=event.link, title=event.title, date=event.date)
+    res = ''.join('{event_number}. <a href="{link}">{title}{date}</a><br />'.format(
+        event_number=event.event_number, link=event.link, title=event.title, date=event.date)
+        for event in events)
     return '<p>{}</p>'.format(res)
+
+
+def get_events_links(events: List[Event], links: Dict[Event, str]) -> Tuple[List[EventLink], List[EventLink]]:
+    events = sorted([event for event in events if event in links], key=lambda item: item.date)
+
+    events_planned = [event for event in events if event.is_planned]
+    events_non_planned = [event for event in events if not event.is_planned]
+
+    return _get_events_links(events=events_planned, links=links), \
+        _get_events_links(events=events_non_planned, links=links)
+
+
+def _get_events_links(events: List[Event], links: Dict[Event, str]) -> List[EventLink]:
+    return [EventLink(event_number=i + 1,
+                      title=html.escape(event.title, quote=False),
+                      link=links[event],
+                      date=format_date(event.date))
+            for i, event in enumerate(events)]
@@ -0,0 +1,84 @@
+import random
+
+import bs4
+import pytest
+
+from mkck.photos import PhotoItem, _get_event_photos_soup, _get_event_photos_stream, _get_photo_items, \
+    _iter_siblings
+
+
+MANIFESTS = [
+    ('<body><p>h</p><p><img src="fot/01.jpg"></p><p>cap 1</p><p><img src="fot/02.jpg"></p></body>',
+     [PhotoItem('01.jpg', 'cap 1'), PhotoItem('02.jpg', '')]),
+    # stray end tag closes every open tag, the rest of the document is not a sibling of the first <p>
+    ('<body><p>h</p></div><p><img src="01.jpg"></p><p>cap</p></body>',
+     []),
+    ('<body><p>h</p><p><img src="01.jpg"></font></p><p>cap</p></body>',
+     [PhotoItem('01.jpg', '')]),
+    # explicit end tag of a void tag is ignored
+    ('<body><p>h</p><p><img src="01.jpg"></img></p><p>cap</p></body>',
+     [PhotoItem('01.jpg', 'cap')]),
+    ('<body><p>h</p><p><img src="01.jpg"></p><p>cap<br>  </br>x</p></body>',
+     [PhotoItem('01.jpg', 'cap  x')]),
+    ('<body><p>h</p><p><img src="01.jpg"><br></br></p><p>cap&nbsp;&amp;&bogus; x</p></body>',
+     [PhotoItem('01.jpg', 'cap &&bogus; x')]),
+    ('<body><p>h</p><p><img src="01.jpg"></p><!-- c --><p><span>a</span> <span>b</span></p></body>',
+     [PhotoItem('01.jpg', 'a b')]),
+    ('<body><p>h</p><p><img src="01.jpg"></p><p>Stránka MKCK - Malokarpatský klub</p></body>',
+     [PhotoItem('01.jpg', '')]),
+]
+
+PARTS = ['<p>', '</p>', '<div>', '</div>', '<font size=2>', '</font>', '<span>', '</span>', '<img src="{:02d}.jpg">',
+         '<img src="fot/{:02d}.jpg"/>', '<br>', '</br>', '<br/>', '</img>', '<b>', '</b>', '<td>', '</td>', '<table>',
+         '</table>', 'cap {}', 'popis &nbsp;fotky {}', '  ', '\n', ' \n ', '&amp;', '&ndash;', '&bogus;', '&#233;',
+         '&nbsp', '<!-- c -->', '<pre>', ' </pre>', 'Stránka MKCK - x', '\xa0', '<img src="">', '</body>',
+         '<a href=x>', '</a>']
+
+# well formed photo and caption paragraphs, so most manifests have photos to compare
+PAIRS = ['<p><img src="fot/{:02d}.jpg"></p>', '<p>cap {}</p>', '<p><font size=2>popis {}</font></p>',
+         '<p><img src="{:02d}.jpg"><br>\n</p>']
+
+
+def _write(tmp_path, content: str) -> str:
+    file = tmp_path / 'foto.htm.txt'
+    file.write_text(content)
+    return str(file)
+
+
+def _random_manifests(count: int, seed: int=1):
+    rnd = random.Random(seed)
+    for _ in range(count):
+        parts = [rnd.choice(PAIRS if rnd.random() < 0.6 else PARTS).format(rnd.randint(1, 20))
+                 for _ in range(rnd.randint(1, 40))]
+        yield rnd.choice(['', '<html><body><p>h</p>']) + ''.join(parts)
+
+
+@pytest.mark.parametrize('content, expected', MANIFESTS)
+def test_stream(tmp_path, content, expected):
+    assert _get_event_photos_stream(file=_write(tmp_path, content)) == expected
+
+
+def test_stream_chunks(tmp_path):
+    for content in _random_manifests(count=500):
+        file = _write(tmp_path, content)
+        expected = _get_event_photos_stream(file=file)
+        for chunk_size in [1, 5, 13]:
+            assert _get_photo_items(siblings=_iter_siblings(file=file, chunk_size=chunk_size)) == expected
+
+
+@pytest.mark.skipif(bs4.__version__ != '4.6.0', reason='stream parser follows the pinned beautifulsoup4 4.6.0')
+@pytest.mark.parametrize('content, expected', MANIFESTS)
+def test_soup(tmp_path, content, expected):
+    assert _get_event_photos_soup(file=_write(tmp_path, content)) == expected
+
+
+@pytest.mark.skipif(bs4.__version__ != '4.6.0', reason='stream parser follows the pinned beautifulsoup4 4.6.0')
+def test_stream_same_as_soup(tmp_path):
+    for content in _random_manifests(count=2000):
+        file = _write(tmp_path, content)
+        if bs4.BeautifulSoup(content, 'html.parser').p is None:
+            # soup backend fails on manifests without <p>
+            continue
+
+        expected = _get_event_photos_soup(file=file)
+        assert _get_event_photos_stream(file=file) == expected, content
@@ -0,0 +1,78 @@
+from os.path import join
+
+import pytest
+
+from benchmark.archive import generate_archive
+from benchmark.year_links import get_year_links_reference
+from mkck.config import FILE_YEAR
+from mkck.year import get_year_links
+
+
+@pytest.mark.parametrize('content, expected', [
+    ('<a href="akciadet.php?rok=2010&cakcie=5">Splav 1.5.</a>',
+     [(5, 'Splav 1.5.', None)]),
+    ('<a href="akciadet.php?rok=2010&amp;cakcie=12" target="_blank">Kemp&nbsp;&amp; voda</a>',
+     [(12, 'Kemp & voda', None)]),
+    ('<a href="akciadet.php?rok=2010&cakcie=KT">Koniec sezóny</a>',
+     [(99, 'Koniec sezóny', None)]),
+    ('<a href="akciadet.php?rok=2per&cakcie=mp1">Akcia 1.2.</a>',
+     [(100, 'Akcia 1.2.', 'mp1')]),
+    ('<a href="http://mkck.sk">MKCK</a>',
+     []),
+])
+def test_same_as_reference(content, expected):
+    assert get_year_links(content=content) == expected
+    assert get_year_links_reference(content=content) == expected
+
+
+@pytest.mark.parametrize('content, expected', [
+    ('<a target="_blank" href="akciadet.php?rok=2per&cakcie=mp1">Akcia 1.2.</a>',
+     [(100, 'Akcia 1.2.', 'mp1')]),
+    ("<a class=x href='akciadet.php?rok=2per&cakcie=mp2'>Akcia 2.2.</a>",
+     [(100, 'Akcia 2.2.', 'mp2')]),
+    ('<A HREF="akciadet.php?rok=2per&cakcie=mp3">Akcia 3.2.</A>',
+     [(100, 'Akcia 3.2.', 'mp3')]),
+    ('<a\nhref=akciadet.php?rok=2010&cakcie=7>Akcia 4.2.</a>',
+     [(7, 'Akcia 4.2.', None)]),
+])
+def test_anchor_shapes(content, expected):
+    assert get_year_links(content=content) == expected
+
+
+def test_non_planned_numbering_keeps_order():
+    content = '\n'.join([
+        '<a href="akciadet.php?rok=2per&cakcie=mp1">A 1.1.</a>',
+        '<a target="_blank" href="akciadet.php?rok=2per&cakcie=mp2">B 2.1.</a>',
+        '<a href="akciadet.php?rok=2per&cakcie=mp3">C 3.1.</a>',
+    ])
+    assert get_year_links(content=content) == [(100, 'A 1.1.', 'mp1'), (101, 'B 2.1.', 'mp2'),
+                                               (102, 'C 3.1.', 'mp3')]
+
+
+def test_several_links_on_one_line():
+    content = ''.join('<td><a href="akciadet.php?rok=2010&cakcie={0}">Akcia {0}</a></td>'.format(i)
+                      for i in range(1, 6))
+    assert get_year_links(content=content) == [(i, 'Akcia {}'.format(i), None) for i in range(1, 6)]
+
+
+def test_order_numbered_kt_non_planned():
+    content = '\n'.join([
+        '<a href="akciadet.php?rok=2per&cakcie=mp1">Mimo 1.1.</a>',
+        '<a href="akciadet.php?rok=2010&cakcie=KT">KT 2.1.</a>',
+        '<a href="akciadet.php?rok=2010&cakcie=3">Tri 3.1.</a>',
+    ])
+    assert get_year_links(content=content) == get_year_links_reference(content=content)
+
+
+def test_generated_archive(tmp_path):
+    years = [2010, 2016]
+    generate_archive(base=str(tmp_path), years=years, events=15, non_planned=4, photos=1, photo_size=64,
+                     paragraphs=1)
+
+    for year in years:
+        with open(join(str(tmp_path), str(year), FILE_YEAR)) as f:
+            content = f.read()
+
+        links = get_year_links(content=content)
+        assert links == get_year_links_reference(content=content)
+        assert len(links) == 15 + 1 + 4
@@ -1,55 +1,146 @@
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_EXCEPTION
 from datetime import date, datetime
 from functools import wraps
-import time
-from typing import List, Optional, Tuple
+from inspect import signature
+from os.path import basename, getsize
+from typing import Callable, Iterator, List, Optional, Tuple
 
 import requests
-from requests.auth import HTTPBasicAuth
-from requests.exceptions import HTTPError
 
-from mkck.debug import notice
-from mkck.gallery import GalleryItem, temporary_image
+from mkck.config import MAX_REQUESTS
+from mkck.debug import debug, notice
+from mkck.gallery import GalleryItem, get_gallery_prefix
+from mkck.metrics import add_bytes, measure
+from wordpress.governor import Governor
+from wordpress.media_hashes import MediaHashIndex, hash_files
+from wordpress.transport import create_session
 
+ITEMS_PER_PAGE = 100
 
-def retry(func):
-    @wraps(func)
-    def wrapper(*args, **kwargs):
-        try:
-            ret = func(*args, **kwargs)
-        except HTTPError as error:
-            print('HTTPError {}. Retry in 5 sec.'.format(error))
-            time.sleep(5)
-            ret = func(*args, **kwargs)
-        return ret
-    return wrapper
+UploadCallback = Callable[[GalleryItem, int], None]
+
+
+def retry(stage: str):
+    # stage is formatted with the call arguments, e.g. 'wordpress.api.{item_type}.GET' is one series per endpoint
+    def decorator(func):
+        func_signature = signature(func)
+
+        @wraps(func)
+        def wrapper(self, *args, **kwargs):
+            name = stage.format(**func_signature.bind(self, *args, **kwargs).arguments)
+
+            # every attempt is measured alone, so backoff sleeps do not get into the latency
+            def attempt():
+                with measure(name):
+                    return func(self, *args, **kwargs)
+
+            return self._governor.call(name, attempt)
+        return wrapper
+    return decorator
 
 
 class WordpressAPI(object):
-    def __init__(self, url: str, username: str, password: str) -> None:
+    def __init__(self, url: str, username: str, password: str, workers: int=1,
+                 hash_index: Optional[MediaHashIndex]=None, session: Optional[requests.Session]=None,
+                 max_requests: int=MAX_REQUESTS) -> None:
         self._api_url = '{}/wp-json/wp/v2'.format(url)
-        self._session = requests.session()
-        self._session.auth = HTTPBasicAuth(username=username, password=password)
-
-    def upload_images(self, images: List[GalleryItem], publish_date: Optional[date]) -> List[int]:
-        resp = []
-
-        for image in images:
-            try:
-                with temporary_image(path=image.path, name=image.name) as tmp_image:
-                    image_id = self.upload_image(image=tmp_image, caption=image.caption, publish_date=publish_date)
-                    resp.append(image_id)
-            except requests.HTTPError as error:
-                print('Failed to upload image. Error: {}'.format(error))
-                raise error
-
-        return resp
-
-    @retry
-    def upload_image(self, image: str, caption: str, publish_date: Optional[date]) -> int:
-        data = {
-            'file': open(image, 'rb'),
-        }
+        self._workers = max(1, workers)
+        self._hash_index = hash_index
+        # shared by uploads, removal and listings, so it is not sized by the upload pool alone
+        max_requests = max(max_requests, self._workers)
+        self._governor = Governor(max_concurrency=max_requests)
+        self._session = session or create_session(username=username, password=password, pool_size=max_requests)
+
+    def upload_images(self, images: List[GalleryItem], publish_date: Optional[date],
+                      on_uploaded: Optional[UploadCallback]=None) -> List[int]:
+        if self._hash_index and images:
+            return self._upload_images_deduplicated(images=images, publish_date=publish_date,
+                                                    on_uploaded=on_uploaded)
+
+        return self._upload_images(images=images, publish_date=publish_date, on_uploaded=on_uploaded)
+
+    def _upload_images_deduplicated(self, images: List[GalleryItem], publish_date: Optional[date],
+                                    on_uploaded: Optional[UploadCallback]) -> List[int]:
+        hash_index = self._hash_index
+        hashes = hash_files(paths=[image.path for image in images], workers=self._workers)
+        media_ids = hash_index.get(hashes=hashes)
+
+        # every distinct unknown content is uploaded once
+        to_upload = {}
+        for image, sha256 in zip(images, hashes):
+            if sha256 not in media_ids and sha256 not in to_upload:
+                to_upload[sha256] = image
+        uploaded_hashes = {image.name: sha256 for sha256, image in to_upload.items()}
+
+        def on_image_uploaded(image: GalleryItem, image_id: int) -> None:
+            hash_index.add(sha256=uploaded_hashes[image.name], media_id=image_id)
+            if on_uploaded:
+                on_uploaded(image, image_id)
+
+        image_ids = self._upload_images(images=list(to_upload.values()), publish_date=publish_date,
+                                        on_uploaded=on_image_uploaded)
+        reused = len(images) - len(image_ids)
+        if reused:
+            notice('Reused {} already uploaded images'.format(reused))
+
+        res = []
+        uploaded_ids = dict(zip(to_upload.keys(), image_ids))
+        for image, sha256 in zip(images, hashes):
+            if sha256 in uploaded_ids and to_upload[sha256] is image:
+                res.append(uploaded_ids[sha256])
+                continue
+
+            image_id = media_ids.get(sha256, uploaded_ids.get(sha256))
+            if on_uploaded:
+                on_uploaded(image, image_id)
+            res.append(image_id)
+
+        hash_index.add_names(names={image.name: image_id for image, image_id in zip(images, res)})
+
+        return res
+
+    def _upload_images(self, images: List[GalleryItem], publish_date: Optional[date],
+                       on_uploaded: Optional[UploadCallback]=None) -> List[int]:
+        if self._workers == 1 or len(images) <= 1:
+            return [self._upload_gallery_item(image=image, publish_date=publish_date, on_uploaded=on_uploaded)
+                    for image in images]
+
+        return self._upload_images_parallel(images=images, publish_date=publish_date, on_uploaded=on_uploaded)
+
+    def _upload_images_parallel(self, images: List[GalleryItem], publish_date: Optional[date],
+                                on_uploaded: Optional[UploadCallback]) -> List[int]:
+        with ThreadPoolExecutor(max_workers=self._workers) as executor:
+            futures = [executor.submit(self._upload_gallery_item, image=image, publish_date=publish_date,
+                                       on_uploaded=on_uploaded)
+                       for image in images]
+
+            done, not_done = wait(futures, return_when=FIRST_EXCEPTION)
+            failed = [future for future in futures if future in done and future.exception()]
+            if failed:
+                for future in not_done:
+                    future.cancel()
+                wait(not_done)
+                raise failed[0].exception()
+
+            # futures keep the order of images, so the ids follow image_number
+            return [future.result() for future in futures]
+
+    def _upload_gallery_item(self, image: GalleryItem, publish_date: Optional[date],
+                             on_uploaded: Optional[UploadCallback]=None) -> int:
+        try:
+            image_id = self.upload_image(image=image.path, caption=image.caption, publish_date=publish_date,
+                                         name=image.name)
+        except requests.HTTPError as error:
+            print('Failed to upload image. Error: {}'.format(error))
+            raise error
+
+        if on_uploaded:
+            on_uploaded(image, image_id)
 
+        return image_id
+
+    @retry(stage='wordpress.api.media.POST')
+    def upload_image(self, image: str, caption: str, publish_date: Optional[date], name: Optional[str]=None) -> int:
         payload = {
             'caption': caption,
             'title': caption,
@@ -60,10 +151,18 @@ class WordpressAPI(object):
                                        month=publish_date.month,
                                        day=publish_date.day).isoformat()
 
-        resp = self._session.post(url=self._api_url + '/media', files=data, data=payload)
+        headers = {
+            'Content-Type': 'image/jpeg',
+            'Content-Disposition': 'attachment; filename="{}"'.format(name or basename(image)),
+        }
+
+        # raw request body is streamed from the file, so it is never read into memory
+        with open(image, 'rb') as f:
+            resp = self._session.post(url=self._api_url + '/media', params=payload, data=f, headers=headers)
         resp.raise_for_status()
 
         image_id = resp.json()['id']
+        add_bytes('wordpress.api.media.POST', getsize(image))
 
         notice('Imported image {}. {}: {}'.format(image_id, image, caption))
         return image_id
@@ -75,12 +174,16 @@ class WordpressAPI(object):
 
         return date_from, date_to
 
-    @retry
     def get_items(self, item_type: str, date_from: Optional[datetime]=None, date_to: Optional[datetime]=None,
                   search: Optional[str]=None) \
             -> List[dict]:
+        return list(self.iter_items(item_type=item_type, date_from=date_from, date_to=date_to, search=search))
+
+    def iter_items(self, item_type: str, date_from: Optional[datetime]=None, date_to: Optional[datetime]=None,
+                   search: Optional[str]=None, prefetch: bool=False) \
+            -> Iterator[dict]:
         payload = {
-            'per_page': 100,
+            'per_page': ITEMS_PER_PAGE,
         }
 
         if date_from:
@@ -92,25 +195,52 @@ class WordpressAPI(object):
         if search:
             payload['search'] = search
 
-        resp = self._session.get(url=self._api_url + '/' + item_type, params=payload)
+        items, total_pages = self._get_items_page(item_type=item_type, payload=payload, page=1)
+        if total_pages <= 1:
+            yield from items
+            return
+
+        if not prefetch:
+            yield from items
+            for page in range(2, total_pages + 1):
+                items, _ = self._get_items_page(item_type=item_type, payload=payload, page=page)
+                yield from items
+            return
+
+        # page N+1 is downloaded while the caller processes page N
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            for page in range(2, total_pages + 1):
+                next_page = executor.submit(self._get_items_page, item_type=item_type, payload=payload, page=page)
+                yield from items
+                items, _ = next_page.result()
+            yield from items
+
+    @retry(stage='wordpress.api.{item_type}.GET')
+    def _get_items_page(self, item_type: str, payload: dict, page: int) -> Tuple[List[dict], int]:
+        resp = self._session.get(url=self._api_url + '/' + item_type, params=dict(payload, page=page))
         resp.raise_for_status()
-        return resp.json()
 
-    @retry
-    def remove_items(self, item_type, item_id) -> None:
-        resp = self._session.delete(url=self._api_url + '/{}/{}'.format(item_type, item_id))
+        total_pages = int(resp.headers.get('X-WP-TotalPages', 1))
+        if page == 1:
+            debug('{} items: {}, pages: {}'.format(item_type, resp.headers.get('X-WP-Total'), total_pages))
+
+        return resp.json(), total_pages
+
+    @retry(stage='wordpress.api.{item_type}.DELETE')
+    def remove_items(self, item_type, item_id, force: bool=False) -> None:
+        params = {'force': 'true'} if force else None
+        resp = self._session.delete(url=self._api_url + '/{}/{}'.format(item_type, item_id), params=params)
         resp.raise_for_status()
         notice('removed {} with id {}'.format(item_type, item_id))
 
-    @retry
+        if item_type == 'media' and self._hash_index:
+            self._hash_index.remove_media(media_id=item_id)
+
     def get_post_images(self, year: int, event_number: int, is_planned: bool=True) -> List[int]:
         date_from, date_to = self.get_year_date_range(year=year)
-        file_name_prefix = '{year}-{planned}{event_number:02d}-'.format(year=year, event_number=event_number,
-                                                                        planned='' if is_planned else 'mp-')
+        file_name_prefix = get_gallery_prefix(year=year, event_number=event_number, is_planned=is_planned)
 
-        items = self.get_items(date_from=date_from, date_to=date_to, item_type='media', search=file_name_prefix)
-        items = sorted(items, key=lambda item: item['media_details']['sizes']['full']['file'])
+        items = self.iter_items(date_from=date_from, date_to=date_to, item_type='media', search=file_name_prefix)
+        files = [(item['media_details']['sizes']['full']['file'], item['id']) for item in items]
 
-        return [item['id']
-                for item in items
-                if item['media_details']['sizes']['full']['file'].startswith(file_name_prefix)]
+        return [item_id for file, item_id in sorted(files) if file.startswith(file_name_prefix)]
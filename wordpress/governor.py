@@ -0,0 +1,136 @@
+from email.utils import parsedate_to_datetime
+import random
+from threading import Condition
+import time
+from typing import Callable, Dict, Optional, TypeVar
+
+from requests.exceptions import ConnectionError, HTTPError, Timeout
+
+from mkck.debug import debug
+
+T = TypeVar('T')
+
+RETRY_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+
+class Governor(object):
+    def __init__(self, max_concurrency: int=1, min_concurrency: int=1, max_retries: int=5,
+                 backoff_base: float=1.0, backoff_cap: float=60.0, latency_factor: float=2.0,
+                 decrease_interval: float=2.0) -> None:
+        self._max_concurrency: int = max(1, max_concurrency)
+        self._min_concurrency: int = max(1, min(min_concurrency, self._max_concurrency))
+        self._max_retries: int = max_retries
+        self._backoff_base: float = backoff_base
+        self._backoff_cap: float = backoff_cap
+        self._latency_factor: float = latency_factor
+        self._decrease_interval: float = decrease_interval
+
+        self._condition: Condition = Condition()
+        self._limit: float = float(self._max_concurrency)
+        self._in_flight: int = 0
+        # tiny listings and multi MB uploads are not comparable, latency is tracked per kind of request
+        self._latency: Dict[str, float] = {}
+        self._last_decrease: float = 0.0
+        self._paused_until: float = 0.0
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    def call(self, kind: str, func: Callable[..., T], *args, **kwargs) -> T:
+        attempt = 0
+        while True:
+            self._acquire()
+            start = time.monotonic()
+            try:
+                ret = func(*args, **kwargs)
+            except (ConnectionError, Timeout, HTTPError) as error:
+                retryable = _is_retryable(error=error)
+                self._release(kind=kind, latency=time.monotonic() - start, failed=retryable)
+                if not retryable or attempt >= self._max_retries:
+                    raise
+
+                delay = self._get_delay(error=error, attempt=attempt)
+                attempt += 1
+                print('{} {}. Retry {} in {:.1f} sec.'.format(type(error).__name__, error, attempt, delay))
+                time.sleep(delay)
+                continue
+            except BaseException:
+                self._release(kind=kind, latency=time.monotonic() - start, failed=False)
+                raise
+
+            self._release(kind=kind, latency=time.monotonic() - start, failed=False)
+            return ret
+
+    def _acquire(self) -> None:
+        with self._condition:
+            while True:
+                pause = self._paused_until - time.monotonic()
+                if pause > 0:
+                    self._condition.wait(timeout=pause)
+                elif self._in_flight >= int(self._limit):
+                    self._condition.wait()
+                else:
+                    break
+
+            self._in_flight += 1
+
+    def _release(self, kind: str, latency: float, failed: bool) -> None:
+        with self._condition:
+            self._in_flight -= 1
+
+            average = self._latency.get(kind)
+            congested = failed or (average is not None and latency > average * self._latency_factor)
+            if not failed:
+                self._latency[kind] = latency if average is None else 0.9 * average + 0.1 * latency
+
+            now = time.monotonic()
+            if congested:
+                # multiplicative decrease, at most once per interval so one burst of errors halves only once
+                if now - self._last_decrease >= self._decrease_interval:
+                    self._limit = max(float(self._min_concurrency), self._limit / 2)
+                    self._last_decrease = now
+                    debug('governor limit decreased to {}'.format(self.limit))
+            else:
+                # additive increase, about +1 per round of limit requests
+                self._limit = min(float(self._max_concurrency), self._limit + 1 / self._limit)
+
+            self._condition.notify_all()
+
+    def _get_delay(self, error: Exception, attempt: int) -> float:
+        retry_after = _get_retry_after(error=error)
+        if retry_after is not None:
+            # everybody waits when the server asks for it
+            with self._condition:
+                self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+            return retry_after
+
+        # exponential backoff with full jitter
+        return random.uniform(0, min(self._backoff_cap, self._backoff_base * 2 ** attempt))
+
+
+def _is_retryable(error: Exception) -> bool:
+    if isinstance(error, HTTPError):
+        return error.response is not None and error.response.status_code in RETRY_STATUS_CODES
+
+    return True
+
+
+def _get_retry_after(error: Exception) -> Optional[float]:
+    response = getattr(error, 'response', None)
+    if response is None:
+        return None
+
+    value = response.headers.get('Retry-After')
+    if not value:
+        return None
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
@@ -1,24 +1,113 @@
+from concurrent.futures import Executor, ThreadPoolExecutor, as_completed
 from datetime import datetime
-from typing import List, Dict, Optional
+from hashlib import sha256
+from threading import Lock
+from typing import List, Dict, Optional, Tuple
+from xmlrpc.client import Fault
 
+from requests.exceptions import RequestException
 from wordpress_xmlrpc import Client, WordPressPost, WordPressPage
-from wordpress_xmlrpc.methods.posts import NewPost
+from wordpress_xmlrpc.methods.posts import EditPost, NewPost
 
+from mkck.config import MAX_REQUESTS
 from mkck.debug import notice
 from mkck.event import Event
+from mkck.gallery import GalleryItem
+from mkck.metrics import measure, timed
+from mkck.optimize import optimize_images
 from mkck.utils import format_iso_date
-from mkck.year_page import get_year_page_content, EventLink
+from mkck.year_page import get_events_links, get_year_page_content, EventLink
 from wordpress.api import WordpressAPI
 from wordpress.errors import ImporterError
+from wordpress.journal import ImportJournal
+from wordpress.media_hashes import MediaHashIndex
+from wordpress.media_index import MediaIndex
+from wordpress.multicall import call_multi
+from wordpress.transport import SessionTransport, create_session
 
 
-class Importer(object):
-    def __init__(self, url: str, username: str, password: str) -> None:
-        self._client: Client = Client(url='{}/xmlrpc.php'.format(url), username=username, password=password)
-        self._api: WordpressAPI = WordpressAPI(url=url, username=username, password=password)
+MULTICALL_CHUNK_SIZE = 20
+
 
-    def create_event_post(self, event: Event) -> None:
-        images = self.get_event_photos(year=event.year, event_number=event.event_number, is_planned=event.is_planned)
+class Importer(object):
+    def __init__(self, url: str, username: str, password: str, upload_workers: int=1,
+                 journal_file: Optional[str]=None, optimize: bool=False,
+                 optimize_executor: Optional[Executor]=None, media_hashes_file: Optional[str]=None,
+                 pool_size: Optional[int]=None, xmlrpc_gzip: bool=True, max_requests: int=MAX_REQUESTS) -> None:
+        hash_index = MediaHashIndex(file=media_hashes_file) if media_hashes_file else None
+        max_requests = max(max_requests, upload_workers)
+
+        # concurrent REST requests plus room for XML-RPC and prefetching calls
+        session = create_session(username=username, password=password, pool_size=pool_size or max_requests + 2)
+        xmlrpc_url = '{}/xmlrpc.php'.format(url)
+        transport = SessionTransport(session=session, url=xmlrpc_url, gzip=xmlrpc_gzip)
+
+        self._url: str = url
+        self._client: Client = Client(url=xmlrpc_url, username=username, password=password, transport=transport)
+        self._api: WordpressAPI = WordpressAPI(url=url, username=username, password=password, workers=upload_workers,
+                                               hash_index=hash_index, session=session, max_requests=max_requests)
+        self._hash_index: Optional[MediaHashIndex] = hash_index
+        self._media_indexes: Dict[int, MediaIndex] = {}
+        self._media_indexes_lock: Lock = Lock()
+        self._journal: Optional[ImportJournal] = ImportJournal(file=journal_file) if journal_file else None
+        self._optimize: bool = optimize
+        self._optimize_executor: Optional[Executor] = optimize_executor
+        # year -> (page id, content hash) of year pages written by this importer
+        self._year_pages: Dict[int, Tuple[int, str]] = {}
+
+    def create_event_post(self, event: Event, images: Optional[List[int]]=None) -> Optional[int]:
+        post = self.prepare_event_post(event=event, images=images)
+        if not post:
+            return None
+
+        with measure('wordpress.xmlrpc.NewPost'):
+            post_id = self._client.call(NewPost(post))
+        self._on_post_created(event=event, post_id=post_id)
+
+        return int(post_id)
+
+    def create_event_posts(self, events: List[Event], year_page: Optional[int]=None,
+                           chunk_size: int=MULTICALL_CHUNK_SIZE) -> Dict[Event, int]:
+        prepared = []
+        for event in events:
+            post = self.prepare_event_post(event=event)
+            if post:
+                prepared.append((event, post))
+
+        res = {}
+        failed = 0
+        for i in range(0, len(prepared), chunk_size):
+            chunk = prepared[i:i + chunk_size]
+            with measure('wordpress.xmlrpc.multicall'):
+                results = call_multi(client=self._client, methods=[NewPost(post) for _, post in chunk])
+
+            for (event, _), result in zip(chunk, results):
+                if isinstance(result, Fault):
+                    notice('Failed to import post. {}. Error: {}'.format(event, result.faultString))
+                    failed += 1
+                    continue
+
+                self._on_post_created(event=event, post_id=result)
+                res[event] = int(result)
+
+        notice('Imported posts: {}, failed: {}'.format(len(res), failed))
+
+        # year page links the posts, so it can be built only after they exist
+        if year_page:
+            self.update_year_page(year=year_page, events=events, posts=res)
+
+        return res
+
+    def prepare_event_post(self, event: Event, images: Optional[List[int]]=None) -> Optional[WordPressPost]:
+        if self._journal:
+            post_id = self._journal.get_post(year=event.year, event_number=event.event_number,
+                                             planned=event.is_planned)
+            if post_id:
+                notice('Skipped post {}, already imported. {}'.format(post_id, event))
+                return None
+
+        if images is None:
+            images = self.resolve_event_photos(event=event)
 
         post = WordPressPost()
         post.post_status = 'publish'
@@ -29,25 +118,122 @@ class Importer(object):
         if post_date:
             post.date = datetime(year=post_date.year, month=post_date.month, day=post_date.day)
 
-        post.terms_names = _get_tags(year=event.year, is_planned=event.is_planned)
+        post.terms_names = get_event_terms(year=event.year, is_planned=event.is_planned)
 
-        post_id = self._client.call(NewPost(post))
+        return post
+
+    def _on_post_created(self, event: Event, post_id) -> None:
         notice('Imported post {}. {}'.format(post_id, event))
 
+        if self._journal:
+            self._journal.add_post(year=event.year, event_number=event.event_number, planned=event.is_planned,
+                                   post_id=int(post_id))
+
+    @timed('wordpress.importer.upload_event_photos')
     def upload_event_photos(self, event: Event) -> List[int]:
-        return self._api.upload_images(images=event.photos, publish_date=event.date)
+        uploaded = {}
+        on_uploaded = None
+        if self._journal:
+            journal = self._journal
+            uploaded = journal.get_media(names=[photo.name for photo in event.photos])
+            if uploaded:
+                notice('Skipped {} already uploaded images. {}'.format(len(uploaded), event))
+
+            def record_upload(photo: GalleryItem, image_id: int) -> None:
+                journal.add_media(year=event.year, name=photo.name, media_id=image_id)
+
+            on_uploaded = record_upload
+
+        photos = [photo for photo in event.photos if photo.name not in uploaded]
+        if self._optimize and photos:
+            photos = optimize_images(images=photos, executor=self._optimize_executor)
+
+        images = self._api.upload_images(images=photos, publish_date=event.date, on_uploaded=on_uploaded)
+        uploaded.update({photo.name: image_id for photo, image_id in zip(photos, images)})
+
+        media_index = self._media_indexes.get(event.year)
+        if media_index:
+            for photo, image_id in zip(photos, images):
+                media_index.add(file=photo.name, media_id=image_id)
+
+        return [uploaded[photo.name] for photo in event.photos]
+
+    def _get_journal_photos(self, event: Event) -> Optional[List[int]]:
+        if not self._journal:
+            return None
+
+        uploaded = self._journal.get_media(names=[photo.name for photo in event.photos])
+        if len(uploaded) != len(event.photos):
+            return None
+
+        return [uploaded[photo.name] for photo in event.photos]
+
+    def _get_hash_index_photos(self, event: Event) -> Optional[List[int]]:
+        if not self._hash_index:
+            return None
+
+        uploaded = self._hash_index.get_names(names=[photo.name for photo in event.photos])
+        if len(uploaded) != len(event.photos):
+            return None
+
+        return [uploaded[photo.name] for photo in event.photos]
+
+    def resolve_event_photos(self, event: Event) -> List[int]:
+        images = self._get_journal_photos(event=event)
+        if images is None:
+            images = self._get_hash_index_photos(event=event)
+        if images is None:
+            images = self.get_event_photos(year=event.year, event_number=event.event_number,
+                                           is_planned=event.is_planned)
+        return images
 
     def get_event_photos(self, year: int, event_number: int, is_planned: bool=True) -> List[int]:
-        return self._api.get_post_images(year=year, event_number=event_number, is_planned=is_planned)
+        return self.get_media_index(year=year).get_images(event_number=event_number, is_planned=is_planned)
+
+    def get_media_index(self, year: int) -> MediaIndex:
+        with self._media_indexes_lock:
+            media_index = self._media_indexes.get(year)
+            if not media_index:
+                media_index = MediaIndex(year=year)
+                media_index.load(api=self._api)
+                self._media_indexes[year] = media_index
+
+        return media_index
+
+    def invalidate_media_index(self, year: int) -> None:
+        self._media_indexes.pop(year, None)
 
-    def remove_year_items(self, year: int) -> None:
+    def remove_year_items(self, year: int, with_media: bool=False, force: bool=False, workers: int=1) -> None:
         date_from, date_to = self._api.get_year_date_range(year=year)
 
-        for item_type in ['posts', 'pages']:
-            items = self._api.get_items(item_type=item_type, date_from=date_from, date_to=date_to)
-            notice('{} items to remove: {}'.format(item_type, len(items)))
-            for item_id in [item['id'] for item in items]:
-                self._api.remove_items(item_type=item_type, item_id=item_id)
+        item_types = ['posts', 'pages', 'media'] if with_media else ['posts', 'pages']
+        removed, failed = 0, 0
+        for item_type in item_types:
+            # collect ids first, deleting while paginating would shift the pages
+            items = self._api.iter_items(item_type=item_type, date_from=date_from, date_to=date_to, prefetch=True)
+            item_ids = [item['id'] for item in items]
+            notice('{} items to remove: {}'.format(item_type, len(item_ids)))
+
+            # media can not be trashed, only deleted
+            item_force = force or item_type == 'media'
+            with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+                futures = {executor.submit(self._api.remove_items, item_type=item_type, item_id=item_id,
+                                           force=item_force): item_id
+                           for item_id in item_ids}
+                for future in as_completed(futures):
+                    try:
+                        future.result()
+                        removed += 1
+                    except RequestException as error:
+                        notice('Failed to remove {} with id {}. Error: {}'.format(item_type, futures[future], error))
+                        failed += 1
+
+        notice('Removed items for year {}: {}, failed: {}'.format(year, removed, failed))
+
+        if with_media:
+            self.invalidate_media_index(year=year)
+        if self._journal:
+            self._journal.remove_year(year=year, with_media=with_media)
 
     def create_year_page(self, year: int) -> None:
         date_from, date_to = self._api.get_year_date_range(year=year)
@@ -82,11 +268,74 @@ class Importer(object):
         page.content = get_year_page_content(events_planned=events_planned, events_non_planned=events_not_planned)
         page.date = datetime(year=year, month=1, day=1)
 
-        page_id = self._client.call(NewPost(page))
+        with measure('wordpress.xmlrpc.NewPost'):
+            page_id = self._client.call(NewPost(page))
         notice('Created page {} for year {}'.format(page_id, year))
 
+    def update_year_page(self, year: int, events: List[Event], posts: Optional[Dict[Event, int]]=None) -> None:
+        links = {}
+        for event in events:
+            post_id = (posts or {}).get(event)
+            if not post_id and self._journal:
+                post_id = self._journal.get_post(year=event.year, event_number=event.event_number,
+                                                 planned=event.is_planned)
+            if post_id:
+                links[event] = self._get_post_link(post_id=post_id)
+
+        if events and not links:
+            notice('Skipped page for year {}, no imported posts are known'.format(year))
+            return
+
+        events_planned, events_not_planned = get_events_links(events=events, links=links)
+
+        page = WordPressPage()
+        page.post_status = 'publish'
+        page.title = 'Akcie {}'.format(year)
+        page.content = get_year_page_content(events_planned=events_planned, events_non_planned=events_not_planned)
+        page.date = datetime(year=year, month=1, day=1)
+        content_hash = sha256(page.content.encode('utf-8')).hexdigest()
+
+        page_id, old_hash = self._get_year_page(year=year)
+        if page_id and content_hash == old_hash:
+            notice('Page {} for year {} is up to date'.format(page_id, year))
+            return
+
+        if page_id:
+            with measure('wordpress.xmlrpc.EditPost'):
+                self._client.call(EditPost(page_id, page))
+            notice('Updated page {} for year {}'.format(page_id, year))
+        else:
+            with measure('wordpress.xmlrpc.NewPost'):
+                page_id = int(self._client.call(NewPost(page)))
+            notice('Created page {} for year {}'.format(page_id, year))
+
+        self._year_pages[year] = (page_id, content_hash)
+        if self._journal:
+            self._journal.add_page(year=year, page_id=page_id, content_hash=content_hash)
+
+    def _get_year_page(self, year: int) -> Tuple[Optional[int], Optional[str]]:
+        if year in self._year_pages:
+            return self._year_pages[year]
+
+        if self._journal:
+            page = self._journal.get_page(year=year)
+            if page:
+                return page
+
+        # page created by an earlier run without journal, content is unknown so it is rewritten once
+        title = 'Akcie {}'.format(year)
+        date_from, date_to = self._api.get_year_date_range(year=year)
+        pages = self._api.get_items(item_type='pages', date_from=date_from, date_to=date_to, search=title)
+        page_ids = sorted(page['id'] for page in pages if page['title']['rendered'] == title)
+
+        return (page_ids[0], None) if page_ids else (None, None)
+
+    def _get_post_link(self, post_id: int) -> str:
+        # short link works with any permalink structure
+        return '{}/?p={}'.format(self._url, post_id)
+
 
-def _get_tags(year: int, is_planned: bool) -> Dict[str, List[str]]:
+def get_event_terms(year: int, is_planned: bool) -> Dict[str, List[str]]:
     res = {
         'post_tag': ['imported', 'rok_{}'.format(year)],
         'category': ['Akcie', 'Akcie_{}'.format(year)]
@@ -0,0 +1,63 @@
+import sqlite3
+from threading import Lock
+from typing import Dict, List, Optional, Tuple
+
+
+class ImportJournal(object):
+    def __init__(self, file: str) -> None:
+        self._lock = Lock()
+        self._conn = sqlite3.connect(file, timeout=30, check_same_thread=False)
+        self._conn.execute('CREATE TABLE IF NOT EXISTS media ('
+                           'name TEXT PRIMARY KEY, year INTEGER NOT NULL, media_id INTEGER NOT NULL)')
+        self._conn.execute('CREATE TABLE IF NOT EXISTS posts ('
+                           'year INTEGER NOT NULL, event_number INTEGER NOT NULL, planned INTEGER NOT NULL, '
+                           'post_id INTEGER NOT NULL, PRIMARY KEY (year, event_number, planned))')
+        self._conn.execute('CREATE TABLE IF NOT EXISTS pages ('
+                           'year INTEGER PRIMARY KEY, page_id INTEGER NOT NULL, content_hash TEXT NOT NULL)')
+        self._conn.commit()
+
+    def add_media(self, year: int, name: str, media_id: int) -> None:
+        with self._lock:
+            self._conn.execute('INSERT OR REPLACE INTO media (name, year, media_id) VALUES (?, ?, ?)',
+                               (name, year, media_id))
+            self._conn.commit()
+
+    def get_media(self, names: List[str]) -> Dict[str, int]:
+        res = {}
+        with self._lock:
+            for name in names:
+                row = self._conn.execute('SELECT media_id FROM media WHERE name = ?', (name,)).fetchone()
+                if row:
+                    res[name] = row[0]
+        return res
+
+    def add_post(self, year: int, event_number: int, planned: bool, post_id: int) -> None:
+        with self._lock:
+            self._conn.execute('INSERT OR REPLACE INTO posts (year, event_number, planned, post_id) '
+                               'VALUES (?, ?, ?, ?)', (year, event_number, int(planned), post_id))
+            self._conn.commit()
+
+    def get_post(self, year: int, event_number: int, planned: bool) -> Optional[int]:
+        with self._lock:
+            row = self._conn.execute('SELECT post_id FROM posts WHERE year = ? AND event_number = ? AND planned = ?',
+                                     (year, event_number, int(planned))).fetchone()
+        return row[0] if row else None
+
+    def add_page(self, year: int, page_id: int, content_hash: str) -> None:
+        with self._lock:
+            self._conn.execute('INSERT OR REPLACE INTO pages (year, page_id, content_hash) VALUES (?, ?, ?)',
+                               (year, page_id, content_hash))
+            self._conn.commit()
+
+    def get_page(self, year: int) -> Optional[Tuple[int, str]]:
+        with self._lock:
+            row = self._conn.execute('SELECT page_id, content_hash FROM pages WHERE year = ?', (year,)).fetchone()
+        return (row[0], row[1]) if row else None
+
+    def remove_year(self, year: int, with_media: bool=True) -> None:
+        with self._lock:
+            if with_media:
+                self._conn.execute('DELETE FROM media WHERE year = ?', (year,))
+            self._conn.execute('DELETE FROM posts WHERE year = ?', (year,))
+            self._conn.execute('DELETE FROM pages WHERE year = ?', (year,))
+            self._conn.commit()
@@ -0,0 +1,61 @@
+from concurrent.futures import ThreadPoolExecutor
+import sqlite3
+from threading import Lock
+from typing import Dict, List
+
+from mkck.utils import hash_file
+
+
+class MediaHashIndex(object):
+    def __init__(self, file: str) -> None:
+        self._lock = Lock()
+        self._conn = sqlite3.connect(file, timeout=30, check_same_thread=False)
+        self._conn.execute('CREATE TABLE IF NOT EXISTS media_hashes ('
+                           'sha256 TEXT PRIMARY KEY, media_id INTEGER NOT NULL)')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS media_hashes_media_id ON media_hashes (media_id)')
+        # gallery names of reused media never reach the server, so galleries are resolved from here
+        self._conn.execute('CREATE TABLE IF NOT EXISTS media_names ('
+                           'name TEXT PRIMARY KEY, media_id INTEGER NOT NULL)')
+        self._conn.commit()
+
+    def get(self, hashes: List[str]) -> Dict[str, int]:
+        res = {}
+        with self._lock:
+            for sha256 in set(hashes):
+                row = self._conn.execute('SELECT media_id FROM media_hashes WHERE sha256 = ?', (sha256,)).fetchone()
+                if row:
+                    res[sha256] = row[0]
+        return res
+
+    def add(self, sha256: str, media_id: int) -> None:
+        with self._lock:
+            self._conn.execute('INSERT OR REPLACE INTO media_hashes (sha256, media_id) VALUES (?, ?)',
+                               (sha256, media_id))
+            self._conn.commit()
+
+    def add_names(self, names: Dict[str, int]) -> None:
+        with self._lock:
+            self._conn.executemany('INSERT OR REPLACE INTO media_names (name, media_id) VALUES (?, ?)',
+                                   list(names.items()))
+            self._conn.commit()
+
+    def get_names(self, names: List[str]) -> Dict[str, int]:
+        res = {}
+        with self._lock:
+            for name in names:
+                row = self._conn.execute('SELECT media_id FROM media_names WHERE name = ?', (name,)).fetchone()
+                if row:
+                    res[name] = row[0]
+        return res
+
+    def remove_media(self, media_id: int) -> None:
+        with self._lock:
+            self._conn.execute('DELETE FROM media_hashes WHERE media_id = ?', (media_id,))
+            self._conn.execute('DELETE FROM media_names WHERE media_id = ?', (media_id,))
+            self._conn.commit()
+
+
+def hash_files(paths: List[str], workers: int=1) -> List[str]:
+    # hashlib releases the GIL on large buffers, so threads hash in parallel
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        return list(executor.map(hash_file, paths))
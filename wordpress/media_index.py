@@ -0,0 +1,42 @@
+from bisect import insort
+import re
+from typing import Dict, List, Tuple
+
+from mkck.debug import notice
+from mkck.gallery import get_gallery_prefix
+from wordpress.api import WordpressAPI
+
+
+RE_MEDIA_FILE = re.compile(r'^(\d{4}-(?:mp-)?\d{2,}-)\d+')
+
+
+class MediaIndex(object):
+    def __init__(self, year: int) -> None:
+        self._year: int = year
+        self._items: Dict[str, List[Tuple[str, int]]] = {}
+
+    @property
+    def year(self) -> int:
+        return self._year
+
+    def load(self, api: WordpressAPI) -> None:
+        self._items = {}
+
+        date_from, date_to = api.get_year_date_range(year=self._year)
+        count = 0
+        for item in api.iter_items(item_type='media', date_from=date_from, date_to=date_to, prefetch=True):
+            self.add(file=item['media_details']['sizes']['full']['file'], media_id=item['id'])
+            count += 1
+
+        notice('Loaded media index for year {}. Items: {}'.format(self._year, count))
+
+    def add(self, file: str, media_id: int) -> None:
+        m = RE_MEDIA_FILE.match(file)
+        if not m:
+            return
+
+        insort(self._items.setdefault(m.group(1), []), (file, media_id))
+
+    def get_images(self, event_number: int, is_planned: bool=True) -> List[int]:
+        prefix = get_gallery_prefix(year=self._year, event_number=event_number, is_planned=is_planned)
+        return [media_id for _, media_id in self._items.get(prefix, [])]
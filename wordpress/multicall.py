@@ -0,0 +1,23 @@
+from typing import List, Union
+from xmlrpc.client import Fault, MultiCall
+
+from wordpress_xmlrpc import Client
+from wordpress_xmlrpc.base import XmlrpcMethod
+
+
+def call_multi(client: Client, methods: List[XmlrpcMethod]) -> List[Union[object, Fault]]:
+    multicall = MultiCall(client.server)
+    for method in methods:
+        getattr(multicall, method.method_name)(*method.get_args(client))
+
+    results = multicall()
+
+    # a fault of one call is returned in its place, other calls are not affected
+    res = []
+    for i, method in enumerate(methods):
+        try:
+            res.append(method.process_result(results[i]))
+        except Fault as fault:
+            res.append(fault)
+
+    return res
@@ -0,0 +1,158 @@
+import asyncio
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from mkck.debug import notice
+from mkck.event import Event
+from mkck.year import get_year_events_list, parse_event
+from wordpress.errors import ImporterError
+from wordpress.importer import Importer
+
+
+# (position in the year's date sorted events list, event, gallery image ids)
+StageItem = Tuple[int, Event, Optional[List[int]]]
+
+
+class ImportPipeline(object):
+    def __init__(self, importer: Importer, parse_executor: Optional[Executor]=None, parse_workers: int=2,
+                 upload_workers: int=2, resolve_workers: int=2, queue_size: int=4,
+                 upload: bool=False, year_page: bool=False) -> None:
+        self._importer: Importer = importer
+        self._parse_executor: Optional[Executor] = parse_executor
+        self._workers: Dict[str, int] = {
+            'parse': max(1, parse_workers),
+            'upload': max(1, upload_workers),
+            'resolve': max(1, resolve_workers),
+            'post': 1,
+        }
+        self._queue_size: int = max(1, queue_size)
+        self._upload: bool = upload
+        self._year_page: bool = year_page
+
+    def run(self, year: int) -> None:
+        loop = asyncio.new_event_loop()
+        try:
+            loop.run_until_complete(self._run(year=year))
+        finally:
+            loop.close()
+
+    async def _run(self, year: int) -> None:
+        loop = asyncio.get_event_loop()
+
+        io_workers = self._workers['upload'] + self._workers['resolve'] + self._workers['post']
+        with ThreadPoolExecutor(max_workers=io_workers) as io_executor:
+            parse_executor = self._parse_executor or io_executor
+
+            # dates are taken from titles, story is read only for events without date in title
+            events = await loop.run_in_executor(io_executor, get_year_events_list, year, True)
+            notice('Pipeline for year {}. Events: {}'.format(year, len(events)))
+
+            posts: Dict[Event, Optional[int]] = {}
+            parsed = asyncio.Queue(maxsize=self._queue_size)
+            uploaded = asyncio.Queue(maxsize=self._queue_size)
+            resolved = asyncio.Queue(maxsize=self._queue_size)
+
+            stages = [
+                self._source(events=events, queue_out=parsed, executor=parse_executor),
+                self._stage(name='upload', func=self._upload_photos, queue_in=parsed, queue_out=uploaded,
+                            executor=io_executor),
+                self._stage(name='resolve', func=self._resolve_photos, queue_in=uploaded, queue_out=resolved,
+                            executor=io_executor),
+                self._sink(queue_in=resolved, executor=io_executor, posts=posts),
+            ]
+
+            tasks = [asyncio.ensure_future(stage) for stage in stages]
+            try:
+                await asyncio.gather(*tasks)
+            except BaseException:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+                raise
+
+            if self._year_page:
+                await asyncio.get_event_loop().run_in_executor(io_executor, self._update_year_page, year, posts)
+
+    async def _source(self, events: List[Event], queue_out: asyncio.Queue, executor: Executor) -> None:
+        loop = asyncio.get_event_loop()
+        queue_in = asyncio.Queue()
+        for position, event in enumerate(events):
+            queue_in.put_nowait((position, event))
+
+        # next event is parsed only after the previous one got into the full queue
+        async def worker() -> None:
+            while not queue_in.empty():
+                position, event = queue_in.get_nowait()
+                parsed_event = await loop.run_in_executor(executor, parse_event, event)
+                await queue_out.put((position, parsed_event, None))
+
+        await asyncio.gather(*[worker() for _ in range(self._workers['parse'])])
+        await _close(queue=queue_out, consumers=self._workers['upload'])
+
+    async def _stage(self, name: str, func: Callable[[Event, Any], Any], queue_in: asyncio.Queue,
+                     queue_out: asyncio.Queue, executor: Executor) -> None:
+        loop = asyncio.get_event_loop()
+
+        async def worker() -> None:
+            while True:
+                item = await queue_in.get()
+                if item is None:
+                    return
+
+                position, event, images = item
+                images = await loop.run_in_executor(executor, func, event, images)
+                await queue_out.put((position, event, images))
+
+        await asyncio.gather(*[worker() for _ in range(self._workers[name])])
+        await _close(queue=queue_out, consumers=self._workers.get(_NEXT_STAGE[name], 1))
+
+    async def _sink(self, queue_in: asyncio.Queue, executor: Executor, posts: Dict[Event, Optional[int]]) -> None:
+        loop = asyncio.get_event_loop()
+
+        # posts are created in the same order as the sequential import creates them
+        pending: Dict[int, StageItem] = {}
+        next_position = 0
+        while True:
+            item = await queue_in.get()
+            if item is None:
+                break
+
+            pending[item[0]] = item
+            while next_position in pending:
+                _, event, images = pending.pop(next_position)
+                posts[event] = await loop.run_in_executor(executor, self._create_post, event, images)
+                next_position += 1
+
+        if pending:
+            raise ImporterError('Pipeline finished with {} events without post'.format(len(pending)))
+
+    def _upload_photos(self, event: Event, images: Optional[List[int]]) -> Optional[List[int]]:
+        if not self._upload:
+            return images
+
+        return self._importer.upload_event_photos(event=event)
+
+    def _resolve_photos(self, event: Event, images: Optional[List[int]]) -> List[int]:
+        if images is not None:
+            return images
+
+        return self._importer.resolve_event_photos(event=event)
+
+    def _create_post(self, event: Event, images: List[int]) -> Optional[int]:
+        return self._importer.create_event_post(event=event, images=images)
+
+    def _update_year_page(self, year: int, posts: Dict[Event, Optional[int]]) -> None:
+        # events skipped as already imported have no id here, importer looks them up in its journal
+        self._importer.update_year_page(year=year, events=list(posts),
+                                        posts={event: post_id for event, post_id in posts.items() if post_id})
+
+
+_NEXT_STAGE = {
+    'upload': 'resolve',
+    'resolve': 'post',
+}
+
+
+async def _close(queue: asyncio.Queue, consumers: int) -> None:
+    for _ in range(consumers):
+        await queue.put(None)
@@ -0,0 +1,110 @@
+from collections import deque
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from typing import Deque, Dict, List, Optional
+
+from mkck.debug import notice
+from mkck.event import Event
+from mkck.progress import Progress
+from mkck.year import get_year_events_list
+from wordpress.errors import ImporterError
+from wordpress.importer import Importer, MULTICALL_CHUNK_SIZE
+from wordpress.pipeline import ImportPipeline
+
+
+STAGES = ['remove', 'parse', 'upload', 'post', 'year-page']
+
+
+class YearScheduler(object):
+    def __init__(self, importer: Importer, stages: List[str], parse_executor: Optional[Executor]=None,
+                 lookahead: int=1, remove_media: bool=False, remove_workers: int=1, pipeline: bool=False,
+                 parse_workers: int=1, upload_workers: int=1) -> None:
+        unknown = [stage for stage in stages if stage not in STAGES]
+        if unknown:
+            raise ImporterError('Unknown stages: {}'.format(', '.join(unknown)))
+        if pipeline and 'post' not in stages:
+            raise ImporterError('Pipeline imports events into posts, it needs the post stage')
+
+        self._importer: Importer = importer
+        self._stages: List[str] = stages
+        self._parse_executor: Optional[Executor] = parse_executor
+        self._lookahead: int = max(0, lookahead)
+        self._remove_media: bool = remove_media
+        self._remove_workers: int = remove_workers
+        self._pipeline: bool = pipeline
+        self._parse_workers: int = parse_workers
+        self._upload_workers: int = upload_workers
+
+    def run(self, years: List[int]) -> None:
+        if self._pipeline:
+            self._run_pipeline(years=years)
+            return
+
+        # upload, post and year page work with parsed events, so they imply parsing
+        needs_events = any(stage in self._stages for stage in ['parse', 'upload', 'post', 'year-page'])
+        units_per_event = int(needs_events) + int('upload' in self._stages) + int('post' in self._stages)
+
+        total = 0
+        if units_per_event:
+            total = sum(len(get_year_events_list(year=year, index_only=True)) for year in years) * units_per_event
+        progress = Progress(total=total)
+
+        # one background thread parses the next years while the current one is uploaded and posted,
+        # parsing itself fans out to the parse executor
+        with ThreadPoolExecutor(max_workers=1) as prefetch:
+            parsed: Deque[Future] = deque()
+            next_index = 0
+            for index, year in enumerate(years):
+                while needs_events and next_index < len(years) and next_index <= index + self._lookahead:
+                    parsed.append(prefetch.submit(self._parse_year, years[next_index], progress))
+                    next_index += 1
+
+                if 'remove' in self._stages:
+                    self._importer.remove_year_items(year=year, with_media=self._remove_media,
+                                                     workers=self._remove_workers)
+
+                if needs_events:
+                    try:
+                        events = parsed.popleft().result()
+                    except BaseException:
+                        for future in parsed:
+                            future.cancel()
+                        raise
+                    self._import_year(year=year, events=events, progress=progress)
+
+        notice('Finished years: {}'.format(', '.join(str(year) for year in years)))
+
+    def _run_pipeline(self, years: List[int]) -> None:
+        # stages overlap between events of one year, years are imported one after another
+        pipeline = ImportPipeline(importer=self._importer, parse_executor=self._parse_executor,
+                                  parse_workers=self._parse_workers, upload_workers=self._upload_workers,
+                                  resolve_workers=self._upload_workers, upload='upload' in self._stages,
+                                  year_page='year-page' in self._stages)
+        for year in years:
+            if 'remove' in self._stages:
+                self._importer.remove_year_items(year=year, with_media=self._remove_media,
+                                                 workers=self._remove_workers)
+
+            pipeline.run(year=year)
+
+        notice('Finished years: {}'.format(', '.join(str(year) for year in years)))
+
+    def _parse_year(self, year: int, progress: Progress) -> List[Event]:
+        events = get_year_events_list(year=year, executor=self._parse_executor)
+        progress.advance(label='{} parse'.format(year), count=len(events))
+        return events
+
+    def _import_year(self, year: int, events: List[Event], progress: Progress) -> None:
+        if 'upload' in self._stages:
+            for event in events:
+                self._importer.upload_event_photos(event=event)
+                progress.advance(label='{} upload'.format(year))
+
+        posts: Dict[Event, int] = {}
+        if 'post' in self._stages:
+            for i in range(0, len(events), MULTICALL_CHUNK_SIZE):
+                chunk = events[i:i + MULTICALL_CHUNK_SIZE]
+                posts.update(self._importer.create_event_posts(events=chunk))
+                progress.advance(label='{} post'.format(year), count=len(chunk))
+
+        if 'year-page' in self._stages:
+            self._importer.update_year_page(year=year, events=events, posts=posts)
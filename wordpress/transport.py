@@ -0,0 +1,44 @@
+from typing import Optional
+from xmlrpc.client import ProtocolError, Transport
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.auth import HTTPBasicAuth
+
+
+def create_session(username: str, password: str, pool_size: int=10) -> requests.Session:
+    session = requests.session()
+    session.auth = HTTPBasicAuth(username=username, password=password)
+
+    # one keep-alive connection pool for every REST and XML-RPC call to the site
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(1, pool_size))
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+
+    return session
+
+
+class SessionTransport(Transport):
+    def __init__(self, session: requests.Session, url: str, gzip: bool=True, timeout: Optional[float]=None) -> None:
+        super().__init__()
+        self._session: requests.Session = session
+        self._url: str = url
+        self._gzip: bool = gzip
+        self._timeout: Optional[float] = timeout
+
+    def request(self, host, handler, request_body, verbose=False):
+        headers = {
+            'Content-Type': 'text/xml',
+            'Accept-Encoding': 'gzip' if self._gzip else 'identity',
+        }
+
+        resp = self._session.post(url=self._url, data=request_body, headers=headers, timeout=self._timeout)
+        if resp.status_code != 200:
+            raise ProtocolError(self._url, resp.status_code, resp.reason, resp.headers)
+
+        # requests has already decoded gzip content
+        parser, unmarshaller = self.getparser()
+        parser.feed(resp.content)
+        parser.close()
+
+        return unmarshaller.close()
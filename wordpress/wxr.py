@@ -0,0 +1,173 @@
+from datetime import date, datetime
+from email.utils import format_datetime
+from os.path import relpath
+from typing import Dict, List, Optional, TextIO
+from urllib.parse import quote
+from xml.sax.saxutils import escape, quoteattr
+
+from mkck.config import DIR_DOCS_BASE
+from mkck.debug import notice
+from mkck.event import Event
+from mkck.gallery import GalleryItem
+from mkck.year import get_year_events_list
+from mkck.year_page import get_events_links, get_year_page_content
+from wordpress.importer import get_event_terms
+
+
+WXR_HEADER = '''<?xml version="1.0" encoding="UTF-8" ?>
+<rss version="2.0"
+  xmlns:excerpt="http://wordpress.org/export/1.2/excerpt/"
+  xmlns:content="http://purl.org/rss/1.0/modules/content/"
+  xmlns:wfw="http://wellformedweb.org/CommentAPI/"
+  xmlns:dc="http://purl.org/dc/elements/1.1/"
+  xmlns:wp="http://wordpress.org/export/1.2/">
+<channel>
+  <title>{title}</title>
+  <link>{site_url}</link>
+  <description></description>
+  <language>sk-SK</language>
+  <wp:wxr_version>1.2</wp:wxr_version>
+  <wp:base_site_url>{site_url}</wp:base_site_url>
+  <wp:base_blog_url>{site_url}</wp:base_blog_url>
+  <wp:author>
+    <wp:author_login>{author}</wp:author_login>
+    <wp:author_display_name>{author}</wp:author_display_name>
+  </wp:author>
+'''
+
+WXR_FOOTER = '''</channel>
+</rss>
+'''
+
+
+class WXRExporter(object):
+    def __init__(self, out: TextIO, site_url: str, media_url: str, author: str='admin', first_id: int=100000) -> None:
+        self._out: TextIO = out
+        self._site_url: str = site_url.rstrip('/')
+        self._media_url: str = media_url.rstrip('/')
+        self._author: str = author
+        self._next_id: int = first_id
+
+    def export(self, years: List[int]) -> None:
+        self._out.write(WXR_HEADER.format(title=escape('MKCK'), site_url=escape(self._site_url),
+                                          author=escape(self._author)))
+        self._write_terms(years=years)
+
+        for year in years:
+            # only one year of events is held in memory at a time
+            self._write_year(year=year, events=get_year_events_list(year=year))
+
+        self._out.write(WXR_FOOTER)
+
+    def _write_terms(self, years: List[int]) -> None:
+        categories, tags = [], []
+        for year in years:
+            for is_planned in [True, False]:
+                terms = get_event_terms(year=year, is_planned=is_planned)
+                categories.extend(name for name in terms['category'] if name not in categories)
+                tags.extend(name for name in terms['post_tag'] if name not in tags)
+
+        for name in categories:
+            self._out.write('  <wp:category><wp:category_nicename>{}</wp:category_nicename>'
+                            '<wp:category_parent></wp:category_parent><wp:cat_name>{}</wp:cat_name>'
+                            '</wp:category>\n'.format(escape(_slug(name)), _cdata(name)))
+
+        for name in tags:
+            self._out.write('  <wp:tag><wp:tag_slug>{}</wp:tag_slug><wp:tag_name>{}</wp:tag_name></wp:tag>\n'.format(
+                escape(_slug(name)), _cdata(name)))
+
+    def _write_year(self, year: int, events: List[Event]) -> None:
+        links: Dict[Event, str] = {}
+
+        for event in events:
+            post_id = self._get_id()
+            images = [self._write_attachment(image=image, parent_id=post_id, publish_date=event.date)
+                      for image in event.photos]
+
+            terms = get_event_terms(year=event.year, is_planned=event.is_planned)
+            self._write_item(item_id=post_id, post_type='post', title=event.title,
+                             content=event.get_content(images=images), publish_date=event.date, terms=terms)
+            links[event] = self._get_link(item_id=post_id)
+
+        events_planned, events_non_planned = get_events_links(events=events, links=links)
+        self._write_item(item_id=self._get_id(), post_type='page', title='Akcie {}'.format(year),
+                         content=get_year_page_content(events_planned=events_planned,
+                                                       events_non_planned=events_non_planned),
+                         publish_date=date(year=year, month=1, day=1))
+
+        notice('Exported year {}. Events: {}'.format(year, len(events)))
+
+    def _write_attachment(self, image: GalleryItem, parent_id: int, publish_date: Optional[date]) -> int:
+        item_id = self._get_id()
+        url = '{}/{}'.format(self._media_url, quote(relpath(image.path, DIR_DOCS_BASE)))
+
+        self._write_item(item_id=item_id, post_type='attachment', title=image.caption, content='',
+                         publish_date=publish_date, excerpt=image.caption, name=image.name.rsplit('.', 1)[0],
+                         status='inherit', parent_id=parent_id,
+                         extra='<wp:attachment_url>{}</wp:attachment_url>'.format(escape(url)))
+        return item_id
+
+    def _write_item(self, item_id: int, post_type: str, title: str, content: str, publish_date: Optional[date],
+                    terms: Optional[Dict[str, List[str]]]=None, excerpt: str='', name: str='',
+                    status: str='publish', parent_id: int=0, extra: str='') -> None:
+        dt = datetime(year=publish_date.year, month=publish_date.month, day=publish_date.day) \
+            if publish_date else datetime.now()
+        link = self._get_link(item_id=item_id)
+
+        lines = [
+            '  <item>',
+            '    <title>{}</title>'.format(_cdata(title)),
+            '    <link>{}</link>'.format(escape(link)),
+            '    <pubDate>{}</pubDate>'.format(format_datetime(dt)),
+            '    <dc:creator>{}</dc:creator>'.format(_cdata(self._author)),
+            '    <guid isPermaLink="false">{}</guid>'.format(escape(link)),
+            '    <description></description>',
+            '    <content:encoded>{}</content:encoded>'.format(_cdata(content)),
+            '    <excerpt:encoded>{}</excerpt:encoded>'.format(_cdata(excerpt)),
+            '    <wp:post_id>{}</wp:post_id>'.format(item_id),
+            '    <wp:post_date>{}</wp:post_date>'.format(dt.strftime('%Y-%m-%d %H:%M:%S')),
+            '    <wp:post_date_gmt>{}</wp:post_date_gmt>'.format(dt.strftime('%Y-%m-%d %H:%M:%S')),
+            '    <wp:comment_status>closed</wp:comment_status>',
+            '    <wp:ping_status>closed</wp:ping_status>',
+            '    <wp:post_name>{}</wp:post_name>'.format(escape(name)),
+            '    <wp:status>{}</wp:status>'.format(status),
+            '    <wp:post_parent>{}</wp:post_parent>'.format(parent_id),
+            '    <wp:menu_order>0</wp:menu_order>',
+            '    <wp:post_type>{}</wp:post_type>'.format(post_type),
+            '    <wp:post_password></wp:post_password>',
+            '    <wp:is_sticky>0</wp:is_sticky>',
+        ]
+
+        for domain, names in (terms or {}).items():
+            for term in names:
+                lines.append('    <category domain={} nicename={}>{}</category>'.format(
+                    quoteattr(domain), quoteattr(_slug(term)), _cdata(term)))
+
+        if extra:
+            lines.append('    {}'.format(extra))
+
+        lines.append('  </item>')
+        self._out.write('\n'.join(lines) + '\n')
+
+    def _get_id(self) -> int:
+        item_id = self._next_id
+        self._next_id += 1
+        return item_id
+
+    def _get_link(self, item_id: int) -> str:
+        return '{}/?p={}'.format(self._site_url, item_id)
+
+
+def export_wxr(file: str, years: List[int], site_url: str, media_url: str, author: str='admin',
+               first_id: int=100000) -> None:
+    with open(file, 'w', encoding='utf-8') as f:
+        WXRExporter(out=f, site_url=site_url, media_url=media_url, author=author, first_id=first_id).export(
+            years=years)
+
+
+def _cdata(text: str) -> str:
+    return '<![CDATA[{}]]>'.format(text.replace(']]>', ']]]]><![CDATA[>'))
+
+
+def _slug(name: str) -> str:
+    return name.lower()